@@ -1,11 +1,34 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+try:
+    from flask_compress import Compress
+    HAS_COMPRESS = True
+except ImportError:
+    HAS_COMPRESS = False
+    Compress = None
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
+import atexit
 import logging
+import queue
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
 import json
+import hashlib
 from dotenv import load_dotenv
-import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Import core modules
 from core.database import DatabaseManager
@@ -14,55 +37,118 @@ from core.message_router import MessageRouter
 from integrations.telegram_webhook import TelegramWebhook
 from integrations.whatsapp_webhook import WhatsAppWebhook
 from core.scheduler import SchedulerManager
+from core.cache import ResponseCache
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('jarvis.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging: request threads only enqueue records; a single listener
+# thread does the (rotating) file and console writes
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_file_handler = RotatingFileHandler('jarvis.log', maxBytes=50 * 1024 * 1024, backupCount=5)
+_log_stream_handler = logging.StreamHandler()
+for _handler in (_log_file_handler, _log_stream_handler):
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener = QueueListener(_log_queue, _log_file_handler, _log_stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+def _dumps(obj):
+    """Serialize to a JSON string, using orjson when it is installed."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, default=str)
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for jsonify() and request.get_json()."""
+    
+    def dumps(self, obj, **kwargs):
+        return _dumps(obj)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+# Pre-serialized acknowledgement for webhook ingest; the actual work happens
+# on the worker pool, so the request thread does no JSON encoding
+_WEBHOOK_ACK = '{"status": "ok"}'
+
 class JarvisApp:
     """
     Main Jarvis application with Flask web framework.
     Handles all messaging platforms through webhooks.
     """
     
-    def __init__(self):
+    def __init__(self, start_scheduler=True):
         self.app = Flask(__name__)
+        if HAS_ORJSON:
+            self.app.json = ORJSONProvider(self.app)
+        # Reject oversized uploads before they are read; Werkzeug spools
+        # accepted multipart files to disk instead of holding them in memory
+        self.app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_MB', 32)) * 1024 * 1024
         CORS(self.app)
+        if HAS_COMPRESS:
+            # gzip/br for JSON responses when the client accepts it
+            Compress(self.app)
+        
+        # Bounded worker pool for webhook processing and a shared HTTP session
+        # for outbound replies, instead of a new thread/connection per update
+        # Sized per gunicorn worker process, so the total stays near 4 per core
+        web_workers = max(1, int(os.getenv('WEB_CONCURRENCY', '1')))
+        webhook_workers = int(os.getenv('WEBHOOK_WORKERS', max(4, (os.cpu_count() or 1) * 4 // web_workers)))
+        self.executor = ThreadPoolExecutor(
+            max_workers=webhook_workers,
+            thread_name_prefix='webhook'
+        )
+        self.http_session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=max(webhook_workers, 32),
+            max_retries=Retry(total=3, backoff_factor=0.2)
+        )
+        self.http_session.mount('https://', adapter)
+        self.http_session.mount('http://', adapter)
+        
+        # Webhook routes hand each update straight to the pool; a chat's updates
+        # still run in order, one worker per chat at a time
+        self._chat_pending = {}
+        self._chat_lock = threading.Lock()
         
         # Initialize core components
         self.db = DatabaseManager()
         self.ai_engine = AIEngine()
+        self.ai_engine.migrate_embeddings(self.db)
         self.scheduler = SchedulerManager(self.db)
-        self.message_router = MessageRouter(self.db, self.ai_engine, self.scheduler)
+        self.cache = ResponseCache(max_entries=1024)
+        self.message_router = MessageRouter(self.db, self.ai_engine, self.scheduler, cache=self.cache)
         
         # Initialize integrations
-        self.telegram = TelegramWebhook(self.message_router)
-        self.whatsapp = WhatsAppWebhook(self.message_router)
+        self.telegram = TelegramWebhook(self.message_router, session=self.http_session)
+        self.whatsapp = WhatsAppWebhook(self.message_router, session=self.http_session)
         
         # Setup routes
         self._setup_routes()
         
-        # Start scheduler
-        self.scheduler.start()
+        # Start scheduler (only one process per deployment runs it)
+        if start_scheduler and _acquire_scheduler_lock():
+            self.scheduler.start()
         logger.info("Jarvis application initialized successfully")
     
     def _setup_routes(self):
         """Setup Flask routes for webhooks and API endpoints."""
         
+        @self.app.errorhandler(RequestEntityTooLarge)
+        def upload_too_large(e):
+            """Return a JSON error for uploads over MAX_CONTENT_LENGTH."""
+            return jsonify({'error': 'File too large'}), 413
+        
         @self.app.route('/', methods=['GET'])
         def health_check():
             """Health check endpoint."""
-            return jsonify({
+            return self._cached_json('health:v1', 2, lambda: {
                 'status': 'healthy',
                 'timestamp': datetime.utcnow().isoformat(),
                 'version': '2.0.0',
@@ -77,10 +163,10 @@ class JarvisApp:
         def telegram_webhook():
             """Handle Telegram webhook."""
             try:
-                update_data = request.get_json()
+                update_data = request.get_json(silent=True)
                 if update_data:
-                    threading.Thread(target=self.telegram.handle_update, args=(update_data,)).start()
-                return jsonify({'status': 'ok'})
+                    self._dispatch_update(self.telegram, update_data)
+                return Response(_WEBHOOK_ACK, mimetype='application/json')
             except Exception as e:
                 logger.error(f"Telegram webhook error: {e}")
                 return jsonify({'error': str(e)}), 500
@@ -93,9 +179,10 @@ class JarvisApp:
                     # Webhook verification
                     return self.whatsapp.verify_webhook(request)
                 else:
-                    update_data = request.get_json()
-                    threading.Thread(target=self.whatsapp.handle_update, args=(update_data,)).start()
-                    return jsonify({'status': 'ok'})
+                    update_data = request.get_json(silent=True)
+                    if update_data:
+                        self._dispatch_update(self.whatsapp, update_data)
+                    return Response(_WEBHOOK_ACK, mimetype='application/json')
             except Exception as e:
                 logger.error(f"WhatsApp webhook error: {e}")
                 return jsonify({'error': str(e)}), 500
@@ -106,8 +193,12 @@ class JarvisApp:
             try:
                 user_id = request.args.get('user_id')
                 limit = int(request.args.get('limit', 50))
-                conversations = self.db.get_conversations(user_id, limit)
-                return jsonify(conversations)
+                scope = user_id or 'all'
+                # Saving a message bumps the version. Without Redis only the worker that
+                # saved it sees the bump, so other workers' listings are kept briefly
+                key = f"conv:{scope}:v{self.cache.version(f'conv:{scope}')}:{limit}"
+                ttl = 30 if self.cache.shared else 2
+                return self._cached_json(key, ttl, lambda: self.db.get_conversations(user_id, limit))
             except Exception as e:
                 logger.error(f"API error: {e}")
                 return jsonify({'error': str(e)}), 500
@@ -119,15 +210,17 @@ class JarvisApp:
                 if 'file' not in request.files:
                     return jsonify({'error': 'No file provided'}), 400
                 
-                file = request.files['file']
+                files = [f for f in request.files.getlist('file') if f.filename]
                 user_id = request.form.get('user_id')
                 
-                if file.filename == '':
+                if not files:
                     return jsonify({'error': 'No file selected'}), 400
                 
-                # Process document
-                result = self.ai_engine.add_document(file, user_id)
-                return jsonify(result)
+                # Process documents; several files share one batched embedding pass
+                results = self.ai_engine.add_documents(files, user_id)
+                if len(results) == 1:
+                    return jsonify(results[0])
+                return jsonify({'documents': results})
                 
             except Exception as e:
                 logger.error(f"Document upload error: {e}")
@@ -140,7 +233,7 @@ class JarvisApp:
                 if request.method == 'GET':
                     user_id = request.args.get('user_id')
                     reminders = self.scheduler.get_user_reminders(user_id)
-                    return jsonify(reminders)
+                    return self._json_response(_dumps(reminders))
                 else:
                     data = request.get_json()
                     result = self.scheduler.create_reminder(data)
@@ -153,32 +246,122 @@ class JarvisApp:
         def get_stats():
             """Get application statistics."""
             try:
-                stats = {
+                return self._cached_json('stats:v1', 5, lambda: {
                     'total_users': self.db.get_user_count(),
                     'total_messages': self.db.get_message_count(),
                     'active_reminders': self.scheduler.get_active_reminder_count(),
                     'knowledge_base_docs': self.db.get_document_count(),
                     'uptime': self.scheduler.get_uptime()
-                }
-                return jsonify(stats)
+                })
             except Exception as e:
                 logger.error(f"Stats API error: {e}")
                 return jsonify({'error': str(e)}), 500
     
+    def _cached_json(self, key, ttl, compute):
+        """Serve a JSON response from the cache, computing and storing it on a miss."""
+        body = self.cache.get(key)
+        if body is None:
+            body = _dumps(compute())
+            self.cache.set(key, body, ttl)
+        return self._json_response(body)
+    
+    def _json_response(self, body):
+        """Wrap a JSON body with an ETag, answering 304 when the client copy is current."""
+        response = Response(body, mimetype='application/json')
+        response.set_etag(hashlib.blake2b(body.encode('utf-8'), digest_size=8).hexdigest())
+        return response.make_conditional(request)
+    
+    def _dispatch_update(self, integration, update_data):
+        """Schedule a webhook update behind any pending updates from the same chat."""
+        try:
+            chat_key = integration.get_chat_key(update_data)
+        except Exception:
+            chat_key = None
+        # Updates without a chat are independent of each other
+        key = (type(integration).__name__, chat_key if chat_key is not None else id(update_data))
+        self._schedule_chat_update(integration, key, update_data)
+    
+    def _schedule_chat_update(self, integration, key, update_data):
+        """Append to the chat's pending updates, starting a worker if none is running."""
+        with self._chat_lock:
+            pending = self._chat_pending.get(key)
+            if pending is not None:
+                pending.append(update_data)
+                return
+            self._chat_pending[key] = deque([update_data])
+        self.executor.submit(self._drain_chat, integration, key)
+    
+    def _drain_chat(self, integration, key):
+        """Process one chat's pending updates sequentially until none are left."""
+        while True:
+            with self._chat_lock:
+                pending = self._chat_pending[key]
+                if not pending:
+                    del self._chat_pending[key]
+                    return
+                update_data = pending.popleft()
+            try:
+                integration.handle_update(update_data)
+            except Exception:
+                logger.exception("Webhook update processing failed")
+    
     def run(self, host='0.0.0.0', port=None, debug=False):
-        """Run the Flask application."""
+        """
+        Run the Flask development server.
+        
+        Production deployments should use gunicorn instead:
+            gunicorn -c gunicorn.conf.py 'app:create_app()'
+        """
         if port is None:
             port = int(os.getenv('PORT', 5000))
         
         logger.info(f"Starting Jarvis server on {host}:{port}")
         self.app.run(host=host, port=port, debug=debug)
 
+_scheduler_lock_file = None
+
+def _acquire_scheduler_lock():
+    """
+    Take a process-wide lock so only one gunicorn worker starts the scheduler.
+    
+    The lock is released by the OS when the owning worker exits, so a
+    replacement worker can pick it up on its next start.
+    """
+    global _scheduler_lock_file
+    if _scheduler_lock_file is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:
+        # No fcntl (e.g. Windows dev machine): single process, always start
+        return True
+    
+    lock_path = os.getenv(
+        'SCHEDULER_LOCK_FILE',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'scheduler.lock')
+    )
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    lock_file = open(lock_path, 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        logger.info("Scheduler already running in another worker; skipping start")
+        return False
+    
+    _scheduler_lock_file = lock_file
+    return True
+
+_app_instance = None
+
 def create_app():
-    """Factory function to create Flask app instance"""
-    app_instance = JarvisApp()
-    return app_instance.app
+    """Factory function to create Flask app instance (one per process)"""
+    global _app_instance
+    if _app_instance is None:
+        _app_instance = JarvisApp()
+    return _app_instance.app
 
 if __name__ == '__main__':
+    # Development server only; see gunicorn.conf.py for production
     app = JarvisApp()
-    port = int(os.getenv('PORT', 5000))
-    app.app.run(host='0.0.0.0', port=port, debug=os.getenv('DEBUG_MODE', 'False').lower() == 'true')
+    app.run(debug=os.getenv('DEBUG_MODE', 'False').lower() == 'true')
@@ -1,12 +1,161 @@
+import ast
 import math
+import operator
 import re
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union
+import functools
+from collections import Counter
+from types import MappingProxyType
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
 import json
 import os
+import sqlite3
+import threading
+import time
+import weakref
 from PIL import Image
-import requests
-from io import BytesIO
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+try:
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+    hyperscan = None
+
+# Precompiled patterns (avoid re's per-call cache lookup on hot paths)
+_CALC_RE = re.compile(r'(sin|cos|tan)\s*\(|([ ^π√e])')
+_SENT_RE = re.compile(r'[.!?]+')
+# Words keep inner apostrophes/hyphens, which are then dropped ("don't" -> "dont")
+_TOKEN_RE = re.compile(r"[\w'-]+")
+_TOKEN_STRIP = str.maketrans('', '', "'-")
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_PHONE_RE = re.compile(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+_DATE_RE = re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b')
+
+_ENTITY_KINDS = ('emails', 'urls', 'phone_numbers', 'dates')
+_ENTITY_RES = (_EMAIL_RE, _URL_RE, _PHONE_RE, _DATE_RE)
+
+def _build_entity_db():
+    """Compile all entity patterns into one Hyperscan database (single pass scan)."""
+    if not HAS_HYPERSCAN:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[p.pattern.encode('utf-8') for p in _ENTITY_RES],
+            ids=list(range(len(_ENTITY_RES))),
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(_ENTITY_RES)
+        )
+        return db
+    except Exception:
+        return None
+
+_ENTITY_DB = _build_entity_db()
+
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does',
+    'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'
+})
+
+# Unit conversion factors to base units
+_UNIT_FACTORS = MappingProxyType({
+    # Length (to meters)
+    'mm': 0.001, 'cm': 0.01, 'm': 1, 'km': 1000,
+    'in': 0.0254, 'ft': 0.3048, 'yd': 0.9144, 'mi': 1609.34,
+    
+    # Weight (to grams)
+    'mg': 0.001, 'g': 1, 'kg': 1000, 't': 1000000,
+    'oz': 28.3495, 'lb': 453.592,
+    
+    # Volume (to liters)
+    'ml': 0.001, 'l': 1, 'gal': 3.78541, 'qt': 0.946353,
+    'cup': 0.236588, 'tbsp': 0.0147868, 'tsp': 0.00492892
+})
+_TEMPERATURE_UNITS = frozenset({'c', 'f', 'k'})
+
+_CALC_ALLOWED_CHARS = frozenset('0123456789+-*/().^%sincotan√πe')
+_CALC_SUBS = {' ': '', '^': '**', 'π': str(math.pi), 'e': str(math.e), '√': 'math.sqrt'}
+
+def _rewrite_calc_token(match) -> str:
+    """Replacement callback for _CALC_RE: map symbols, wrap trig calls in math.*."""
+    if match.group(1):
+        return f"math.{match.group(1)}("
+    return _CALC_SUBS[match.group(2)]
+
+_CALC_MAX_EXPONENT = 10000
+# Integer results (and intermediates) wider than this are rejected; anything past
+# ~1024 bits cannot be formatted as a float anyway
+_CALC_MAX_BITS = 4096
+
+def _checked_pow(left, right):
+    """left ** right, refusing integer powers whose result would exceed _CALC_MAX_BITS."""
+    if abs(right) > _CALC_MAX_EXPONENT:
+        raise ValueError('exponent too large')
+    if isinstance(left, int) and isinstance(right, int) and right > 0 and abs(left) > 1:
+        # |left| >= 2**(bit_length - 1), so this only rejects results surely over the
+        # limit; anything let through is at most ~2x the limit and is caught afterwards
+        if right * (abs(left).bit_length() - 1) > _CALC_MAX_BITS:
+            raise ValueError('result too large')
+    return left ** right
+
+_CALC_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _checked_pow,
+}
+_CALC_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_CALC_FUNCS = {'sin': math.sin, 'cos': math.cos, 'tan': math.tan, 'sqrt': math.sqrt}
+
+def _eval_node(node):
+    """Evaluate a parsed arithmetic expression, allowing only numbers, operators and math.* calls."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _CALC_BIN_OPS:
+        left = _eval_node(node.left)
+        right = _eval_node(node.right)
+        result = _CALC_BIN_OPS[type(node.op)](left, right)
+        if isinstance(result, int) and result.bit_length() > _CALC_MAX_BITS:
+            raise ValueError('result too large')
+        return result
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _CALC_UNARY_OPS:
+        return _CALC_UNARY_OPS[type(node.op)](_eval_node(node.operand))
+    if (isinstance(node, ast.Call) and len(node.args) == 1 and not node.keywords
+            and isinstance(node.func, ast.Attribute) and node.func.attr in _CALC_FUNCS
+            and isinstance(node.func.value, ast.Name) and node.func.value.id == 'math'):
+        return _CALC_FUNCS[node.func.attr](_eval_node(node.args[0]))
+    raise ValueError('unsupported expression')
+
+@functools.lru_cache(maxsize=4096)
+def _eval_pure(expression: str) -> Tuple[str, Optional[float]]:
+    """
+    Sanitize and evaluate an expression; memoized since it is deterministic.
+    Returns (rewritten_expression, result), with result None for invalid input.
+    """
+    # Allow only safe characters (spaces are dropped by the rewrite below)
+    if not all(c.lower() in _CALC_ALLOWED_CHARS for c in expression if c != ' '):
+        return expression.replace(' ', ''), None
+    
+    # Rewrite symbols and trig calls in a single pass
+    expression = _CALC_RE.sub(_rewrite_calc_token, expression)
+    
+    # Evaluate safely
+    result = _eval_node(ast.parse(expression, mode='eval').body)
+    return expression, result
+
 
 class CalculatorTools:
     """
@@ -25,28 +174,10 @@ class CalculatorTools:
             Dict: Result and status
         """
         try:
-            # Remove spaces and validate expression
-            expression = expression.replace(' ', '')
-            
-            # Allow only safe characters
-            allowed_chars = set('0123456789+-*/().^%sincotan√πe')
-            if not all(c.lower() in allowed_chars for c in expression):
+            expression, result = _eval_pure(expression)
+            if result is None:
                 return {'error': 'Invalid characters in expression', 'status': 'error'}
             
-            # Replace common mathematical symbols
-            expression = expression.replace('^', '**')
-            expression = expression.replace('π', str(math.pi))
-            expression = expression.replace('e', str(math.e))
-            expression = expression.replace('√', 'math.sqrt')
-            
-            # Handle trigonometric functions
-            expression = re.sub(r'sin\(([^)]+)\)', r'math.sin(\1)', expression)
-            expression = re.sub(r'cos\(([^)]+)\)', r'math.cos(\1)', expression)
-            expression = re.sub(r'tan\(([^)]+)\)', r'math.tan(\1)', expression)
-            
-            # Evaluate safely
-            result = eval(expression, {"__builtins__": {}, "math": math})
-            
             return {
                 'expression': expression,
                 'result': result,
@@ -70,39 +201,22 @@ class CalculatorTools:
         Returns:
             Dict: Conversion result
         """
-        # Unit conversion factors to base units
-        conversions = {
-            # Length (to meters)
-            'mm': 0.001, 'cm': 0.01, 'm': 1, 'km': 1000,
-            'in': 0.0254, 'ft': 0.3048, 'yd': 0.9144, 'mi': 1609.34,
-            
-            # Weight (to grams)
-            'mg': 0.001, 'g': 1, 'kg': 1000, 't': 1000000,
-            'oz': 28.3495, 'lb': 453.592,
-            
-            # Temperature (special handling)
-            'c': 'celsius', 'f': 'fahrenheit', 'k': 'kelvin',
-            
-            # Volume (to liters)
-            'ml': 0.001, 'l': 1, 'gal': 3.78541, 'qt': 0.946353,
-            'cup': 0.236588, 'tbsp': 0.0147868, 'tsp': 0.00492892
-        }
-        
         try:
             from_unit = from_unit.lower()
             to_unit = to_unit.lower()
             
             # Handle temperature conversions separately
-            if from_unit in ['c', 'f', 'k'] or to_unit in ['c', 'f', 'k']:
+            if from_unit in _TEMPERATURE_UNITS or to_unit in _TEMPERATURE_UNITS:
                 return CalculatorTools._convert_temperature(value, from_unit, to_unit)
             
             # Check if units exist
-            if from_unit not in conversions or to_unit not in conversions:
+            from_factor = _UNIT_FACTORS.get(from_unit)
+            to_factor = _UNIT_FACTORS.get(to_unit)
+            if from_factor is None or to_factor is None:
                 return {'error': 'Unknown unit', 'status': 'error'}
             
             # Convert to base unit, then to target unit
-            base_value = value * conversions[from_unit]
-            result = base_value / conversions[to_unit]
+            result = value * from_factor / to_factor
             
             return {
                 'original_value': value,
@@ -152,31 +266,92 @@ class CalculatorTools:
 class TaskScheduler:
     """
     Task scheduling and reminder system.
+    Tasks live in a SQLite table indexed by (completed, due_ts).
     """
     
     def __init__(self, data_dir: str):
         self.data_dir = data_dir
         self.tasks_file = os.path.join(data_dir, 'scheduled_tasks.json')
-        self.tasks = self._load_tasks()
+        self.db_path = os.path.join(data_dir, 'tasks.db')
+        self._lock = threading.Lock()
+        
+        os.makedirs(data_dir, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._initialize_database()
+        self._migrate_json_tasks()
+        
+        # Writes only append to the WAL; fold it back into the main file
+        # when this scheduler goes away
+        self._finalizer = weakref.finalize(self, TaskScheduler._close_connection, self.conn)
     
-    def _load_tasks(self) -> List[Dict]:
-        """Load tasks from file."""
+    @staticmethod
+    def _close_connection(conn):
+        """Checkpoint and truncate the WAL, then close the connection."""
         try:
-            if os.path.exists(self.tasks_file):
-                with open(self.tasks_file, 'r') as f:
-                    return json.load(f)
-            return []
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
         except Exception:
-            return []
+            pass
+        conn.close()
+    
+    def close(self):
+        """Release the database connection and compact the write-ahead log."""
+        self._finalizer()
+    
+    def _initialize_database(self):
+        """Create the tasks table and index if they don't exist."""
+        with self._lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute('PRAGMA wal_autocheckpoint=1000')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT,
+                    description TEXT,
+                    due_date TEXT,
+                    due_ts REAL,
+                    priority TEXT,
+                    completed INTEGER DEFAULT 0,
+                    created_at TEXT,
+                    completed_at TEXT
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_due ON tasks(completed, due_ts)')
+            self.conn.commit()
     
-    def _save_tasks(self):
-        """Save tasks to file."""
+    def _migrate_json_tasks(self):
+        """Import tasks from the legacy JSON file into an empty table."""
         try:
-            os.makedirs(self.data_dir, exist_ok=True)
-            with open(self.tasks_file, 'w') as f:
-                json.dump(self.tasks, f, indent=2)
+            if not os.path.exists(self.tasks_file):
+                return
+            with self._lock:
+                if self.conn.execute('SELECT 1 FROM tasks LIMIT 1').fetchone():
+                    return
+                with open(self.tasks_file, 'r') as f:
+                    legacy_tasks = json.load(f)
+                self.conn.executemany('''
+                    INSERT INTO tasks (id, title, description, due_date, due_ts,
+                                       priority, completed, created_at, completed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(
+                    task.get('id'), task.get('title'), task.get('description'),
+                    task.get('due_date'), task.get('due_timestamp'), task.get('priority'),
+                    int(bool(task.get('completed'))), task.get('created_at'), task.get('completed_at')
+                ) for task in legacy_tasks])
+                self.conn.commit()
         except Exception as e:
-            print(f"Error saving tasks: {e}")
+            print(f"Error migrating tasks: {e}")
+    
+    @staticmethod
+    def _row_to_task(row) -> Dict:
+        """Convert a tasks row into the task dict shape callers expect."""
+        task = dict(row)
+        task['due_timestamp'] = task.pop('due_ts')
+        task['completed'] = bool(task['completed'])
+        if task.get('completed_at') is None:
+            task.pop('completed_at', None)
+        return task
     
     def add_task(self, title: str, description: str, due_date: str, priority: str = 'medium') -> Dict:
         """
@@ -195,23 +370,18 @@ class TaskScheduler:
             # Parse due date
             due_datetime = datetime.strptime(due_date, '%Y-%m-%d %H:%M')
             
-            task = {
-                'id': len(self.tasks) + 1,
-                'title': title,
-                'description': description,
-                'due_date': due_date,
-                'due_timestamp': due_datetime.timestamp(),
-                'priority': priority,
-                'completed': False,
-                'created_at': datetime.now().isoformat()
-            }
-            
-            self.tasks.append(task)
-            self._save_tasks()
+            with self._lock:
+                cursor = self.conn.execute('''
+                    INSERT INTO tasks (title, description, due_date, due_ts, priority, completed, created_at)
+                    VALUES (?, ?, ?, ?, ?, 0, ?)
+                ''', (title, description, due_date, due_datetime.timestamp(),
+                      priority, datetime.now().isoformat()))
+                self.conn.commit()
+                task_id = cursor.lastrowid
             
             return {
                 'message': f'Task "{title}" scheduled for {due_date}',
-                'task_id': task['id'],
+                'task_id': task_id,
                 'status': 'success'
             }
             
@@ -223,17 +393,17 @@ class TaskScheduler:
     def get_upcoming_tasks(self, days_ahead: int = 7) -> List[Dict]:
         """Get tasks due within specified days."""
         try:
-            now = datetime.now().timestamp()
-            future = (datetime.now() + timedelta(days=days_ahead)).timestamp()
+            now = time.time()
+            future = now + days_ahead * 86400
             
-            upcoming = []
-            for task in self.tasks:
-                if not task['completed'] and now <= task['due_timestamp'] <= future:
-                    upcoming.append(task)
+            with self._lock:
+                rows = self.conn.execute('''
+                    SELECT * FROM tasks
+                    WHERE completed = 0 AND due_ts BETWEEN ? AND ?
+                    ORDER BY due_ts
+                ''', (now, future)).fetchall()
             
-            # Sort by due date
-            upcoming.sort(key=lambda x: x['due_timestamp'])
-            return upcoming
+            return [self._row_to_task(row) for row in rows]
             
         except Exception as e:
             print(f"Error getting upcoming tasks: {e}")
@@ -242,14 +412,18 @@ class TaskScheduler:
     def complete_task(self, task_id: int) -> Dict:
         """Mark a task as completed."""
         try:
-            for task in self.tasks:
-                if task['id'] == task_id:
-                    task['completed'] = True
-                    task['completed_at'] = datetime.now().isoformat()
-                    self._save_tasks()
-                    return {'message': f'Task "{task["title"]}" marked as completed', 'status': 'success'}
+            with self._lock:
+                row = self.conn.execute('SELECT title FROM tasks WHERE id = ?', (task_id,)).fetchone()
+                if not row:
+                    return {'error': 'Task not found', 'status': 'error'}
+                
+                self.conn.execute(
+                    'UPDATE tasks SET completed = 1, completed_at = ? WHERE id = ?',
+                    (datetime.now().isoformat(), task_id)
+                )
+                self.conn.commit()
             
-            return {'error': 'Task not found', 'status': 'error'}
+            return {'message': f'Task "{row["title"]}" marked as completed', 'status': 'success'}
             
         except Exception as e:
             return {'error': f'Error completing task: {str(e)}', 'status': 'error'}
@@ -261,55 +435,99 @@ class ImageAnalyzer:
     """
     
     @staticmethod
-    def analyze_image(image_path: str) -> Dict:
+    def analyze_image(image_path: str, full: bool = True) -> Dict:
         """
         Analyze an image and extract information.
         
         Args:
             image_path (str): Path to image file
+            full (bool): Also decode pixels for colour analysis; when False
+                only the header is read
             
         Returns:
             Dict: Image analysis results
         """
+        if full:
+            return ImageAnalyzer.analyze_image_full(image_path)
+        return ImageAnalyzer.analyze_image_meta(image_path)
+    
+    @staticmethod
+    def _header_info(img, image_path: str) -> Dict:
+        """Build metadata from header fields only (no pixel decode)."""
+        width, height = img.size
+        pixels = width * height
+        if pixels > 1000000:  # > 1MP
+            quality = 'High resolution'
+        elif pixels > 300000:  # > 0.3MP
+            quality = 'Medium resolution'
+        else:
+            quality = 'Low resolution'
+        
+        return {
+            'filename': os.path.basename(image_path),
+            'format': img.format,
+            'mode': img.mode,
+            'size': img.size,
+            'width': width,
+            'height': height,
+            'aspect_ratio': round(width / height, 2),
+            'file_size': os.path.getsize(image_path),
+            'quality': quality,
+            'status': 'success'
+        }
+    
+    @staticmethod
+    def analyze_image_meta(image_path: str) -> Dict:
+        """Return format, size and mode without decoding the image data."""
         try:
+            # Image.open only parses the header until pixels are accessed
             with Image.open(image_path) as img:
-                # Basic image information
-                info = {
-                    'filename': os.path.basename(image_path),
-                    'format': img.format,
-                    'mode': img.mode,
-                    'size': img.size,
-                    'width': img.width,
-                    'height': img.height,
-                    'aspect_ratio': round(img.width / img.height, 2),
-                    'file_size': os.path.getsize(image_path),
-                    'status': 'success'
-                }
+                return ImageAnalyzer._header_info(img, image_path)
+        except Exception as e:
+            return {'error': f'Image analysis error: {str(e)}', 'status': 'error'}
+    
+    @staticmethod
+    def analyze_image_full(image_path: str) -> Dict:
+        """Return header metadata plus the dominant colour (decodes the image)."""
+        try:
+            with Image.open(image_path) as img:
+                info = ImageAnalyzer._header_info(img, image_path)
                 
                 # Color analysis
                 if img.mode == 'RGB':
-                    colors = img.getcolors(maxcolors=256*256*256)
-                    if colors:
-                        # Get dominant color
-                        dominant_color = max(colors, key=lambda x: x[0])[1]
+                    dominant_color = ImageAnalyzer._dominant_color(img)
+                    if dominant_color:
                         info['dominant_color'] = {
                             'rgb': dominant_color,
                             'hex': '#{:02x}{:02x}{:02x}'.format(*dominant_color)
                         }
                 
-                # Image quality assessment
-                if img.width * img.height > 1000000:  # > 1MP
-                    info['quality'] = 'High resolution'
-                elif img.width * img.height > 300000:  # > 0.3MP
-                    info['quality'] = 'Medium resolution'
-                else:
-                    info['quality'] = 'Low resolution'
-                
                 return info
                 
         except Exception as e:
             return {'error': f'Image analysis error: {str(e)}', 'status': 'error'}
     
+    @staticmethod
+    def _dominant_color(img) -> Optional[tuple]:
+        """Return the most frequent RGB colour of an RGB image."""
+        if HAS_NUMPY:
+            arr = np.asarray(img, dtype=np.uint8)
+            packed = (
+                (arr[..., 0].astype(np.uint32) << 16)
+                | (arr[..., 1].astype(np.uint32) << 8)
+                | arr[..., 2]
+            )
+            if not packed.size:
+                return None
+            values, counts = np.unique(packed.ravel(), return_counts=True)
+            dom = int(values[counts.argmax()])
+            return ((dom >> 16) & 0xFF, (dom >> 8) & 0xFF, dom & 0xFF)
+        
+        colors = img.getcolors(maxcolors=256*256*256)
+        if colors:
+            return max(colors, key=lambda x: x[0])[1]
+        return None
+    
     @staticmethod
     def resize_image(image_path: str, output_path: str, max_width: int = 800, max_height: int = 600) -> Dict:
         """
@@ -326,17 +544,21 @@ class ImageAnalyzer:
         """
         try:
             with Image.open(image_path) as img:
+                original_size = img.size
+                original_bytes = os.path.getsize(image_path)
+                
                 # Calculate new size maintaining aspect ratio
                 img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
                 
                 # Save resized image
                 img.save(output_path, optimize=True, quality=85)
+                output_bytes = os.path.getsize(output_path)
                 
                 return {
-                    'original_size': Image.open(image_path).size,
+                    'original_size': original_size,
                     'new_size': img.size,
                     'output_path': output_path,
-                    'compression_ratio': round(os.path.getsize(output_path) / os.path.getsize(image_path), 2),
+                    'compression_ratio': round(output_bytes / original_bytes, 2),
                     'status': 'success'
                 }
                 
@@ -363,7 +585,7 @@ class TextAnalyzer:
         try:
             # Basic metrics
             words = text.split()
-            sentences = re.split(r'[.!?]+', text)
+            sentences = _SENT_RE.split(text)
             sentences = [s.strip() for s in sentences if s.strip()]
             
             # Character analysis
@@ -381,15 +603,10 @@ class TextAnalyzer:
             reading_time_minutes = word_count / 200
             
             # Most common words (excluding common stop words)
-            stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'}
-            
-            word_freq = {}
-            for word in words:
-                clean_word = re.sub(r'[^\w]', '', word.lower())
-                if clean_word and clean_word not in stop_words and len(clean_word) > 2:
-                    word_freq[clean_word] = word_freq.get(clean_word, 0) + 1
-            
-            top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
+            tokens = (t.translate(_TOKEN_STRIP) for t in _TOKEN_RE.findall(text.lower()))
+            top_words = Counter(
+                t for t in tokens if len(t) > 2 and t not in _STOP_WORDS
+            ).most_common(10)
             
             return {
                 'character_count': char_count,
@@ -419,21 +636,41 @@ class TextAnalyzer:
             Dict: Extracted entities
         """
         try:
-            # Regular expressions for common entities
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-            phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-            date_pattern = r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b'
-            
-            entities = {
-                'emails': re.findall(email_pattern, text),
-                'urls': re.findall(url_pattern, text),
-                'phone_numbers': re.findall(phone_pattern, text),
-                'dates': re.findall(date_pattern, text),
-                'status': 'success'
-            }
+            if _ENTITY_DB is not None:
+                entities = TextAnalyzer._scan_entities(text)
+            else:
+                entities = {
+                    kind: [m.group(0) for m in pattern.finditer(text)]
+                    for kind, pattern in zip(_ENTITY_KINDS, _ENTITY_RES)
+                }
+            entities['status'] = 'success'
             
             return entities
             
         except Exception as e:
             return {'error': f'Entity extraction error: {str(e)}', 'status': 'error'}
+    
+    @staticmethod
+    def _scan_entities(text: str) -> Dict:
+        """Find all entity kinds in one Hyperscan pass over the text."""
+        data = text.encode('utf-8')
+        spans = [[] for _ in _ENTITY_KINDS]
+        
+        def on_match(pattern_id, start, end, flags, context):
+            spans[pattern_id].append((start, end))
+        
+        _ENTITY_DB.scan(data, match_event_handler=on_match)
+        
+        # Hyperscan reports every match end; keep leftmost-longest,
+        # non-overlapping spans to mirror re.finditer
+        entities = {}
+        for kind, kind_spans in zip(_ENTITY_KINDS, spans):
+            kind_spans.sort(key=lambda span: (span[0], -span[1]))
+            matches = []
+            last_end = -1
+            for start, end in kind_spans:
+                if start >= last_end:
+                    matches.append(data[start:end].decode('utf-8', errors='ignore'))
+                    last_end = end
+            entities[kind] = matches
+        return entities
@@ -1,8 +1,21 @@
 import os
+import asyncio
+import inspect
+import importlib.util
 import logging
 import json
-from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+import base64
+import time
+import threading
+import random
+import re
+import struct
+import sys
+import hashlib
+from binascii import a2b_base64
+from collections import OrderedDict
+from functools import cached_property, lru_cache
+from typing import Callable, List, Dict, Any, Optional, Tuple
 
 
 try:
@@ -12,12 +25,65 @@ except ImportError:
     HAS_PIL = False
     Image = None
 
-# Disable memory-heavy features for deployment
-HAS_SENTENCE_TRANSFORMERS = False
-HAS_WHISPER = False
-SentenceTransformer = None
-np = None
-whisper = None
+# openai-whisper pulls in torch, so only probe for it here; it is imported when
+# WHISPER_BACKEND=openai (or faster-whisper is missing) and a voice note arrives
+HAS_WHISPER = importlib.util.find_spec('whisper') is not None
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+try:
+    from faster_whisper import WhisperModel
+    HAS_FASTER_WHISPER = True
+except ImportError:
+    HAS_FASTER_WHISPER = False
+    WhisperModel = None
+
+try:
+    import simsimd
+    HAS_SIMSIMD = True
+except ImportError:
+    HAS_SIMSIMD = False
+    simsimd = None
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+try:
+    import pypdfium2
+    HAS_PDFIUM = True
+except ImportError:
+    HAS_PDFIUM = False
+    pypdfium2 = None
+
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+    fitz = None
+
+try:
+    import PyPDF2
+    HAS_PYPDF2 = True
+except ImportError:
+    HAS_PYPDF2 = False
+    PyPDF2 = None
+
+try:
+    from docx import Document as DocxDocument
+    HAS_DOCX = True
+except ImportError:
+    HAS_DOCX = False
+    DocxDocument = None
 
 try:
     import yt_dlp
@@ -27,14 +93,238 @@ except ImportError:
     yt_dlp = None
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import shutil
 import tempfile
 import google.generativeai as genai
+from google.generativeai import client as genai_client
 import openai
 from dotenv import load_dotenv
+from .embeddings import EmbeddingBackend
+from .cache import SemanticCache
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# google-generativeai >= 0.5 accepts a system_instruction that the service can cache
+try:
+    _GEMINI_SYSTEM_INSTRUCTION = 'system_instruction' in inspect.signature(genai.GenerativeModel).parameters
+except (TypeError, ValueError):
+    _GEMINI_SYSTEM_INSTRUCTION = False
+
+# Resolved once at import; '..' is normalized away
+_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+_DOCS_DIR = os.path.join(_DATA_DIR, 'documents')
+_GEN_DIR = os.path.join(_DOCS_DIR, 'generated')
+
+# One pooled session for the engine's own outbound HTTP (e.g. fetching generated image URLs)
+_HTTP = requests.Session()
+_HTTP_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=20,
+                            max_retries=Retry(total=2, backoff_factor=0.2))
+_HTTP.mount('https://', _HTTP_ADAPTER)
+_HTTP.mount('http://', _HTTP_ADAPTER)
+
+# genai.configure is process-global, so it only ever runs under this lock (see _gemini_model)
+_GENAI_LOCK = threading.Lock()
+
+def _gemini_model(key: str, model_id: str, system_instruction: str = None):
+    """
+    Build a GenerativeModel with its own client for key. The SDK otherwise picks up
+    whichever key is configured at the model's first request, so configure and the
+    client lookup run under _GENAI_LOCK; later configure calls never touch this model.
+    """
+    kwargs = {'system_instruction': system_instruction} if system_instruction else {}
+    with _GENAI_LOCK:
+        genai.configure(api_key=key)
+        model = genai.GenerativeModel(model_id, **kwargs)
+        model._client = genai_client.get_default_generative_client()
+    return model
+
+# (context key, prompt label) pairs appended after the base prompt, in order
+_CTX_FIELDS = (
+    ('user_documents', 'Relevant documents'),
+    ('conversation_history', 'Recent conversation'),
+    ('user_preferences', 'User preferences'),
+)
+
+# Stored int8 embeddings are prefixed so older float32/JSON rows still decode.
+# 'q8:' holds one row; 'q8m:<dim>:' holds one row per document chunk.
+_Q8_PREFIX = 'q8:'
+_Q8M_PREFIX = 'q8m:'
+_Q8_SCALE = 127.0
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def _quantize(row):
+    """Map a unit-normalized float row to int8 with a fixed 1/127 scale."""
+    return np.clip(np.round(row * _Q8_SCALE), -128, 127).astype(np.int8)
+
+@lru_cache(maxsize=1)
+def _dot_rows_kernel():
+    """numba int8 row-dot kernel, or None without numba (imported on first use)."""
+    try:
+        import numba
+    except ImportError:
+        return None
+    
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def dot_rows(matrix, query):
+        """Dot each int8 row of matrix with query, accumulating in int32 across cores."""
+        out = np.empty(matrix.shape[0], dtype=np.int32)
+        for i in numba.prange(matrix.shape[0]):
+            acc = np.int32(0)
+            for j in range(matrix.shape[1]):
+                acc += np.int32(matrix[i, j]) * np.int32(query[j])
+            out[i] = acc
+        return out
+    
+    return dot_rows
+
+# Heavy models shared by every AIEngine in the process, loaded once on first use
+_MODEL_CACHE: Dict[Any, Any] = {}
+_MODEL_LOCK = threading.Lock()
+
+def _shared_model(key, loader: Callable[[], Any]):
+    """Return the process-wide model for key, running loader() only once."""
+    try:
+        return _MODEL_CACHE[key]
+    except KeyError:
+        pass
+    with _MODEL_LOCK:
+        if key not in _MODEL_CACHE:
+            _MODEL_CACHE[key] = loader()
+        return _MODEL_CACHE[key]
+
+def _decode_embedding(blob: str):
+    """Decode a stored embedding (int8, base64 float32 or legacy JSON list) to int8 rows (n, dim)."""
+    if blob.startswith(_Q8M_PREFIX):
+        dim, payload = blob[len(_Q8M_PREFIX):].split(':', 1)
+        return np.frombuffer(base64.b64decode(payload), dtype=np.int8).reshape(-1, int(dim))
+    if blob.startswith(_Q8_PREFIX):
+        return np.frombuffer(base64.b64decode(blob[len(_Q8_PREFIX):]), dtype=np.int8)[None, :]
+    if blob.startswith('['):
+        values = orjson.loads(blob) if HAS_ORJSON else json.loads(blob)
+        row = np.asarray(values, dtype=np.float32)
+        norm = np.linalg.norm(row)
+        return _quantize(row / norm if norm else row)[None, :]
+    return _quantize(np.frombuffer(base64.b64decode(blob), dtype=np.float32))[None, :]
+
+class _ArrayLRU:
+    """Thread-safe LRU of NumPy-backed values, bounded by their total nbytes."""
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: 'OrderedDict[Any, Tuple[Any, int]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            self._items.move_to_end(key)
+            return entry[0]
+    
+    def put(self, key, value, nbytes: int) -> None:
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._items[key] = (value, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._bytes -= self._items.popitem(last=False)[1][1]
+
+# Decoded rows per document and stacked matrices per document set. Keyed by document
+# id plus the blob's length and tail (changed only by migrate_embeddings), so lookups
+# never hash whole ~100 KB blobs
+_DECODED_EMBEDDINGS = _ArrayLRU(32 << 20)
+_STACKED_EMBEDDINGS = _ArrayLRU(32 << 20)
+
+def _embedding_key(doc: Dict) -> Tuple:
+    """Cache key for a document's stored embedding."""
+    blob = doc['embeddings']
+    if doc.get('id') is None:
+        return ('blob', blob)
+    return (doc['id'], len(blob), blob[-32:])
+
+def _document_rows(doc: Dict):
+    """A document's int8 embedding rows, decoded once while the blob is unchanged."""
+    key = _embedding_key(doc)
+    rows = _DECODED_EMBEDDINGS.get(key)
+    if rows is None:
+        rows = _decode_embedding(doc['embeddings'])
+        _DECODED_EMBEDDINGS.put(key, rows, rows.nbytes)
+    return rows
+
+def _stack_embeddings(docs: List[Dict]):
+    """
+    Decode and stack a document set's chunk embeddings into one int8 matrix.
+    Returns (matrix, starts) where starts[i] is document i's first row.
+    """
+    key = tuple(_embedding_key(doc) for doc in docs)
+    stacked = _STACKED_EMBEDDINGS.get(key)
+    if stacked is None:
+        blocks = [_document_rows(doc) for doc in docs]
+        starts = np.cumsum([0] + [len(block) for block in blocks[:-1]])
+        stacked = (np.vstack(blocks), starts)
+        _STACKED_EMBEDDINGS.put(key, stacked, stacked[0].nbytes + stacked[1].nbytes)
+    return stacked
+
+_PNG_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+_JPEG_MODES = {1: 'L', 3: 'RGB', 4: 'CMYK'}
+# SOF0-SOF15 minus DHT (C4), JPG (C8) and DAC (CC)
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def _read_image_header(image_path: str) -> Optional[Tuple[str, str, Tuple[int, int]]]:
+    """
+    Read (format, mode, (width, height)) straight from a PNG, JPEG or WebP header.
+    Returns None for other or unusual files so the caller can fall back to PIL.
+    """
+    with open(image_path, 'rb') as f:
+        head = f.read(32)
+        if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+            width, height, depth, color_type = struct.unpack('>IIBB', head[16:26])
+            if color_type == 3:
+                return 'PNG', 'P', (width, height)
+            if depth == 8 and color_type in _PNG_MODES:
+                return 'PNG', _PNG_MODES[color_type], (width, height)
+            return None
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+                width, height = struct.unpack('<HH', head[26:30])
+                return 'WEBP', 'RGB', (width & 0x3FFF, height & 0x3FFF)
+            if chunk == b'VP8L' and head[20] == 0x2F:
+                bits = int.from_bytes(head[21:25], 'little')
+                size = ((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+                return 'WEBP', 'RGBA' if bits >> 28 & 1 else 'RGB', size
+            if chunk == b'VP8X':
+                width = int.from_bytes(head[24:27], 'little') + 1
+                height = int.from_bytes(head[27:30], 'little') + 1
+                return 'WEBP', 'RGBA' if head[20] & 0x10 else 'RGB', (width, height)
+            return None
+        if head[:2] != b'\xff\xd8':
+            return None
+        # Walk the JPEG segment headers, seeking over payloads, until a SOF marker
+        f.seek(2)
+        while True:
+            marker = f.read(4)
+            if len(marker) < 4 or marker[0] != 0xFF:
+                return None
+            length = struct.unpack('>H', marker[2:])[0]
+            if marker[1] in _JPEG_SOF:
+                sof = f.read(6)
+                if len(sof) < 6 or sof[5] not in _JPEG_MODES:
+                    return None
+                height, width = struct.unpack('>HH', sof[1:5])
+                return 'JPEG', _JPEG_MODES[sof[5]], (width, height)
+            f.seek(length - 2, os.SEEK_CUR)
+
 class AIEngine:
     """
     Comprehensive AI engine with multiple capabilities:
@@ -45,6 +335,25 @@ class AIEngine:
     - Media processing
     """
     
+    _BASE_PROMPT = """You are Jarvis, the personal AI assistant for Badmus Qudus Ayomide.\n\nGuidelines:\n- Always call yourself Jarvis.\n- Do not mention providers or models (e.g., Gemini, OpenAI).\n- Be concise, accurate, and helpful.\n- Use a motivational, respectful tone when appropriate.\n- Manage tasks and reminders flexibly when asked.\n- If uncertain, say so briefly and propose next steps.\n\nCapabilities:\n- Q&A, web info, calculations, conversions\n- Tasks/reminders, document/image analysis\n- Media downloading, translation, crypto, weather, news"""
+    
+    http = _HTTP
+    
+    # Only the head of a document is embedded and summarized
+    MAX_EXTRACT_CHARS = 200_000
+    
+    # Chunks embedded per document (~1000 chars each)
+    MAX_EMBED_CHUNKS = 64
+    
+    # Text embeddings memoized by content digest (re-uploads skip the forward pass)
+    EMBED_CACHE_SIZE = 4096
+    
+    # Query vectors kept per engine (failed embeddings are not cached)
+    QUERY_CACHE_SIZE = 1024
+    
+    # Seconds a successful deep health check is trusted before calling the LLM again
+    HEALTH_TTL = 60
+    
     def __init__(self):
         # Initialize LLM
         self.gemini_api_key = os.getenv('GEMINI_API_KEY')
@@ -55,9 +364,12 @@ class AIEngine:
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         
         if self.gemini_keys:
-            # Configure with first key; per-call we may rotate
-            genai.configure(api_key=self.gemini_keys[0])
-            self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+            # Models are built once per (key, model), each bound to its own key
+            self._gemini_models: Dict[Tuple[str, str, Optional[str]], Any] = {}
+            # Per-key rate-limit bench: monotonic expiry and consecutive 429 count
+            self._key_cooldowns: Dict[str, float] = {}
+            self._key_strikes: Dict[str, int] = {}
+            self.gemini_model = _gemini_model(self.gemini_keys[0], 'gemini-1.5-flash')
             self.llm_provider = 'gemini'
         elif self.openai_api_key:
             # OpenAI as primary provider
@@ -65,34 +377,83 @@ class AIEngine:
         else:
             raise ValueError("No LLM API key found. Set GEMINI_API_KEY/GEMINI_API_KEYS or OPENAI_API_KEY")
         
-        # Initialize embeddings model (can be disabled via env)
-        self.embedding_model = None
-        if os.getenv('DISABLE_EMBEDDINGS', 'false').lower() not in ('1', 'true', 'yes'):
-            if HAS_SENTENCE_TRANSFORMERS:
-                try:
-                    self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-                except Exception as e:
-                    logger.warning(f"Failed to load sentence transformer: {e}")
-                    self.embedding_model = None
-            else:
-                logger.warning("Sentence transformers not available. Semantic search disabled.")
-        
-        # Initialize Whisper for speech-to-text (can be disabled via env)
-        self.whisper_model = None
-        if os.getenv('DISABLE_WHISPER', 'false').lower() not in ('1', 'true', 'yes'):
-            try:
-                self.whisper_model = whisper.load_model("base")
-                logger.info("Whisper model loaded successfully")
-            except Exception as e:
-                logger.error(f"Failed to load Whisper model: {e}")
-                self.whisper_model = None
+        # Embedding, Whisper and semantic-cache objects load lazily on first use
+        # (see the cached properties below); models are shared process-wide
+        self.whisper_backend = os.getenv('WHISPER_BACKEND', 'ctranslate2').lower()
+        # Repeated queries (paging, "more results") skip the forward pass
+        self._query_cache: 'OrderedDict[str, Any]' = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        # blake2b digest -> float32 vector bytes, least recently used first
+        self._embed_cache: 'OrderedDict[bytes, bytes]' = OrderedDict()
+        self._embed_cache_lock = threading.Lock()
         
         # Document storage
-        self.documents_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'documents')
-        os.makedirs(self.documents_path, exist_ok=True)
+        self.documents_path = _DOCS_DIR
+        self.generated_path = _GEN_DIR
+        os.makedirs(self.generated_path, exist_ok=True)
+        
+        self._last_health_ok = float('-inf')
+        
+        # Optionally warm the embedding and Whisper models side by side instead of on
+        # first use; each load is mostly GIL-free file IO and native init
+        if os.getenv('PRELOAD_MODELS', 'false').lower() in ('1', 'true', 'yes'):
+            for name in ('embedding_model', 'whisper_model'):
+                threading.Thread(target=getattr, args=(self, name), name=f'preload-{name}',
+                                 daemon=True).start()
         
         logger.info(f"AI Engine initialized with {self.llm_provider}")
     
+    @cached_property
+    def embedding_model(self):
+        """Sentence embedding backend, or None when disabled/unavailable (can be disabled via env)."""
+        if os.getenv('DISABLE_EMBEDDINGS', 'false').lower() in ('1', 'true', 'yes'):
+            return None
+        # INT8 ONNX when USE_ONNX_EMBEDDINGS=1, FP32 SentenceTransformer otherwise
+        return _shared_model('embeddings', EmbeddingBackend.load)
+    
+    @cached_property
+    def semantic_cache(self) -> Optional[SemanticCache]:
+        """LLM responses reused for a user's near-identical prompts (opt-in, needs embeddings)."""
+        if os.getenv('SEMANTIC_CACHE', 'false').lower() not in ('1', 'true', 'yes') or not self.embedding_model:
+            return None
+        return SemanticCache(
+            threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92')),
+            ttl=int(os.getenv('SEMANTIC_CACHE_TTL', '3600'))
+        )
+    
+    @cached_property
+    def whisper_model(self):
+        """Speech-to-text model, or None when disabled/unavailable (can be disabled via env)."""
+        if os.getenv('DISABLE_WHISPER', 'false').lower() in ('1', 'true', 'yes'):
+            return None
+        backend, model = _shared_model(('whisper', self.whisper_backend), self._load_whisper)
+        self.whisper_backend = backend
+        return model
+    
+    def _load_whisper(self) -> Tuple[str, Any]:
+        """
+        Load the Whisper backend: WHISPER_BACKEND=ctranslate2 uses faster-whisper
+        with INT8 weights, otherwise the reference model. Returns (backend, model).
+        """
+        try:
+            if self.whisper_backend == 'ctranslate2' and HAS_FASTER_WHISPER:
+                device = self._whisper_device()
+                compute_type = "float16" if device == "cuda" else "int8"
+                model = WhisperModel(
+                    self._whisper_model_source(), device=device, compute_type=compute_type,
+                    cpu_threads=os.cpu_count() or 1, num_workers=1,
+                    download_root=os.path.join(_DATA_DIR, 'models')
+                )
+                logger.info(f"faster-whisper model loaded successfully ({device}, {compute_type})")
+                return 'ctranslate2', model
+            elif HAS_WHISPER:
+                model = self._load_openai_whisper()
+                logger.info("Whisper model loaded successfully")
+                return 'openai', model
+        except Exception as e:
+            logger.error(f"Failed to load Whisper model: {e}")
+        return self.whisper_backend, None
+    
     def generate_response(self, prompt: str, context: Dict = None, max_tokens: int = 1000) -> str:
         """
         Generate AI response using configured LLM.
@@ -109,57 +470,50 @@ class AIEngine:
             # Build full prompt with context
             full_prompt = self._build_prompt_with_context(prompt, context)
             
-            if self.llm_provider == 'gemini':
-                # Try each Gemini key until success
-                last_err = None
-                for key in self.gemini_keys:
-                    try:
-                        genai.configure(api_key=key)
-                        model = genai.GenerativeModel('gemini-1.5-flash')
-                        response = model.generate_content(full_prompt)
-                        return response.text.strip()
-                    except Exception as e:
-                        last_err = e
-                        continue
-                # Fallback to OpenAI if available
-                if self.openai_api_key:
-                    from openai import OpenAI
-                    client = OpenAI(api_key=self.openai_api_key)
-                    response = client.chat.completions.create(
-                        model="gpt-3.5-turbo",
-                        messages=[
-                            {"role": "system", "content": "You are Jarvis, an intelligent AI assistant."},
-                            {"role": "user", "content": full_prompt}
-                        ],
-                        max_tokens=max_tokens,
-                        temperature=0.7
-                    )
-                    return response.choices[0].message.content.strip()
-                raise last_err or RuntimeError("Gemini request failed")
+            # A user's near-duplicate context-free prompts are answered from the semantic cache
+            scope = self._semantic_cache_scope(context)
+            cache_key = self._semantic_cache_key(prompt) if scope is not None else None
+            if cache_key is not None:
+                cached = self.semantic_cache.get(cache_key, scope)
+                if cached is not None:
+                    return cached
             
-            elif self.llm_provider == 'openai':
-                from openai import OpenAI
-                client = OpenAI(api_key=self.openai_api_key)
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are Jarvis, an intelligent AI assistant."},
-                        {"role": "user", "content": full_prompt}
-                    ],
-                    max_tokens=max_tokens,
-                    temperature=0.7
-                )
-                return response.choices[0].message.content.strip()
+            response = self._complete(full_prompt, max_tokens)
+            if cache_key is not None and response:
+                self.semantic_cache.set(cache_key, response, scope)
+            return response
             
         except Exception as e:
-            # quota_exceeded_handler - marker for fix detection
-            error_str = str(e).lower()
-            logger.error(f"Error generating response: {e}")
+            return self._error_reply(e)
+    
+    async def agenerate(self, prompt: str, max_tokens: int = 1000) -> str:
+        """
+        Async completion of a bare prompt (no system prompt or context) for event-loop
+        callers; raises when every provider fails. Gemini keys are rotated as in
+        _complete: the next healthy key is only tried after the current one fails,
+        so each request is sent (and billed) once.
+        """
+        if self.llm_provider == 'gemini':
+            try:
+                return await asyncio.to_thread(self._with_key_rotation, lambda key: self._gemini_generate(
+                    self._gemini_model_for(key, 'gemini-1.5-flash'), prompt
+                ))
+            except Exception as e:
+                if not self.openai_api_key:
+                    raise
+                logger.warning(f"Gemini failed across keys, falling back to OpenAI: {e}")
+        return await asyncio.to_thread(self._complete_openai, prompt, max_tokens)
+    
+    def _error_reply(self, e: Exception) -> str:
+        """Map an LLM failure to the user-facing reply."""
+        # quota_exceeded_handler - marker for fix detection
+        error_str = str(e).lower()
+        logger.error(f"Error generating response: {e}")
+        
+        # Handle specific quota errors
+        if "quota" in error_str or "429" in error_str:
+            return """🚫 **AI Quota Exceeded**
             
-            # Handle specific quota errors
-            if "quota" in error_str or "429" in error_str:
-                return """🚫 **AI Quota Exceeded**
-                
 I've reached my daily AI processing limit. Here's what you can still do:
 
 ✅ **Working Commands:**
@@ -171,42 +525,286 @@ I've reached my daily AI processing limit. Here's what you can still do:
 Try AI-powered features like conversations and email summaries later.
 
 💡 **Tip:** Use specific commands above for immediate help!"""
-            
-            elif "authentication" in error_str or "unauthorized" in error_str:
-                return "🔑 AI authentication issue. Please contact support."
-            
-            elif "network" in error_str or "connection" in error_str:
-                return "🌐 Network issue. Please try again in a moment."
-            
-            else:
-                return f"⚠️ AI processing error. Try using specific commands like 'tech quote' or /help instead."
+        
+        elif "authentication" in error_str or "unauthorized" in error_str:
+            return "🔑 AI authentication issue. Please contact support."
+        
+        elif "network" in error_str or "connection" in error_str:
+            return "🌐 Network issue. Please try again in a moment."
+        
+        else:
+            return f"⚠️ AI processing error. Try using specific commands like 'tech quote' or /help instead."
     
-    def _build_prompt_with_context(self, prompt: str, context: Dict = None) -> str:
-        """Build prompt with relevant context."""
-        base_prompt = """You are Jarvis, the personal AI assistant for Badmus Qudus Ayomide.\n\nGuidelines:\n- Always call yourself Jarvis.\n- Do not mention providers or models (e.g., Gemini, OpenAI).\n- Be concise, accurate, and helpful.\n- Use a motivational, respectful tone when appropriate.\n- Manage tasks and reminders flexibly when asked.\n- If uncertain, say so briefly and propose next steps.\n\nCapabilities:\n- Q&A, web info, calculations, conversions\n- Tasks/reminders, document/image analysis\n- Media downloading, translation, crypto, weather, news"""
+    def _gemini_model_for(self, key: str, model_id: str, system_instruction: str = None):
+        """GenerativeModel bound to key, built on first use and then reused."""
+        if not _GEMINI_SYSTEM_INSTRUCTION:
+            system_instruction = None
+        cache_key = (key, model_id, system_instruction)
+        model = self._gemini_models.get(cache_key)
+        if model is None:
+            model = self._gemini_models.setdefault(
+                cache_key, _gemini_model(key, model_id, system_instruction)
+            )
+        return model
+    
+    def _gemini_chat(self, key: str, user_prompt: str) -> str:
+        """One chat turn on a key; inlines the system prompt on SDKs without system_instruction."""
+        contents = user_prompt if _GEMINI_SYSTEM_INSTRUCTION else f"{self._BASE_PROMPT}\n\n{user_prompt}"
+        model = self._gemini_model_for(key, 'gemini-1.5-flash', system_instruction=self._BASE_PROMPT)
+        return self._gemini_generate(model, contents)
+    
+    def _complete(self, full_prompt: str, max_tokens: int) -> str:
+        """Send a built prompt to the configured LLM; raises when every provider fails."""
+        if self.llm_provider == 'gemini':
+            # Try healthy Gemini keys until success
+            last_err = None
+            try:
+                return self._with_key_rotation(lambda key: self._gemini_chat(key, full_prompt))
+            except Exception as e:
+                last_err = e
+            # Fallback to OpenAI if available
+            if self.openai_api_key:
+                return self._complete_openai(full_prompt, max_tokens)
+            raise last_err or RuntimeError("Gemini request failed")
         
-        if context:
-            if context.get('user_documents'):
-                base_prompt += f"\n\nRelevant documents: {context['user_documents']}"
-            if context.get('conversation_history'):
-                base_prompt += f"\n\nRecent conversation: {context['conversation_history']}"
-            if context.get('user_preferences'):
-                base_prompt += f"\n\nUser preferences: {context['user_preferences']}"
+        elif self.llm_provider == 'openai':
+            return self._complete_openai(full_prompt, max_tokens)
         
-        return f"{base_prompt}\n\nUser: {prompt}\n\nJarvis:"
+        raise RuntimeError(f"Unknown LLM provider: {self.llm_provider}")
+    
+    @staticmethod
+    def _gemini_generate(model, contents) -> str:
+        """Run one synchronous Gemini text request."""
+        return model.generate_content(contents).text.strip()
+    
+    def _complete_openai(self, full_prompt: str, max_tokens: int) -> str:
+        """Send a built prompt to OpenAI chat completions."""
+        from openai import OpenAI
+        client = OpenAI(api_key=self.openai_api_key)
+        response = client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": self._BASE_PROMPT},
+                {"role": "user", "content": full_prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=0.7
+        )
+        return response.choices[0].message.content.strip()
+    
+    @staticmethod
+    def _semantic_cache_scope(context: Optional[Dict]) -> Optional[str]:
+        """
+        The user a reply may be cached for, or None when it must not be cached: no user
+        to scope it to, or documents/history that make the answer specific to this turn.
+        """
+        if not context or context.get('user_id') is None:
+            return None
+        if context.get('user_documents') or context.get('conversation_history'):
+            return None
+        return str(context['user_id'])
+    
+    def _semantic_cache_key(self, prompt: str):
+        """Embedding of the user prompt, or None if caching is off."""
+        if self.semantic_cache is None or not self.embedding_model:
+            return None
+        return self.generate_embeddings(prompt)
+    
+    @staticmethod
+    def _is_rate_limited(error: Exception) -> bool:
+        """True for quota/429 errors (google.api_core ResourceExhausted and friends)."""
+        if type(error).__name__ in ('ResourceExhausted', 'TooManyRequests', 'RateLimitError'):
+            return True
+        text = str(error).lower()
+        return '429' in text or 'quota' in text or 'rate limit' in text
+    
+    def _available_keys(self) -> List[str]:
+        """Gemini keys not cooling down, or the one that recovers first if all are benched."""
+        now = time.monotonic()
+        keys = [k for k in self.gemini_keys if self._key_cooldowns.get(k, 0.0) <= now]
+        if not keys:
+            # Everything is benched: try the key that recovers first rather than failing outright
+            keys = [min(self.gemini_keys, key=lambda k: self._key_cooldowns.get(k, 0.0))]
+        return keys
+    
+    def _record_key_result(self, key: str, error: Optional[Exception] = None) -> None:
+        """Clear a key's strikes on success; bench it for min(60, 2**strikes + jitter)s on a 429."""
+        if error is None:
+            self._key_strikes.pop(key, None)
+            self._key_cooldowns.pop(key, None)
+        elif self._is_rate_limited(error):
+            strikes = self._key_strikes.get(key, 0) + 1
+            self._key_strikes[key] = strikes
+            self._key_cooldowns[key] = time.monotonic() + min(60.0, 2 ** strikes + random.random())
+    
+    def _with_key_rotation(self, fn: Callable[[str], Any]) -> Any:
+        """
+        Call fn(key) for each Gemini key that is not cooling down and return the
+        first result. A rate-limited key is benched so later requests skip it
+        instead of retrying it immediately. Raises the last error when every key fails.
+        """
+        last_err = None
+        for key in self._available_keys():
+            try:
+                result = fn(key)
+            except Exception as e:
+                last_err = e
+                self._record_key_result(key, e)
+                continue
+            self._record_key_result(key)
+            return result
+        raise last_err or RuntimeError("Gemini request failed")
+    
+    def _build_prompt_with_context(self, prompt: str, context: Dict = None) -> str:
+        """
+        Build the per-request turn: dynamic context, then the user prompt.
+        The static _BASE_PROMPT is sent separately as the system instruction so
+        providers can cache that prefix.
+        """
+        parts = []
+        if context:
+            parts.extend(
+                f"{label}: {context[key]}\n\n" for key, label in _CTX_FIELDS if context.get(key)
+            )
+        parts.append(f"User: {prompt}\n\nJarvis:")
+        return ''.join(parts)
     
-    def generate_embeddings(self, text: str) -> Optional[List[float]]:
-        """Generate embeddings for text."""
+    def generate_embeddings(self, text: str):
+        """
+        Generate embeddings for text.
+        
+        Returns:
+            np.ndarray: L2-normalized float32 vector, or None
+        """
         if not text or not self.embedding_model:
             return None
         
+        embeddings = self.generate_embeddings_batch([text])
+        return embeddings[0] if embeddings is not None else None
+    
+    def generate_embeddings_batch(self, texts: List[str], batch_size: int = 32):
+        """
+        Generate embeddings for many texts in length-bucketed batches.
+        
+        Returns:
+            np.ndarray: One L2-normalized float32 row per text, or None on failure
+        """
+        if not texts or not self.embedding_model:
+            return None
+        
         try:
-            embedding = self.embedding_model.encode([text])
-            return embedding[0].tolist()
+            # 16-byte digests keep the cache small however long the chunks are
+            keys = [hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest() for text in texts]
+            rows: List[Optional[bytes]] = [None] * len(texts)
+            with self._embed_cache_lock:
+                for i, key in enumerate(keys):
+                    cached = self._embed_cache.get(key)
+                    if cached is not None:
+                        self._embed_cache.move_to_end(key)
+                        rows[i] = cached
+            
+            misses = [i for i, row in enumerate(rows) if row is None]
+            if not misses:
+                return np.vstack([np.frombuffer(row, dtype=np.float32) for row in rows])
+            encoded = np.asarray(
+                self.embedding_model.encode([texts[i] for i in misses], batch_size=batch_size),
+                dtype=np.float32
+            )
+            if len(misses) == len(texts):
+                out = encoded
+            else:
+                out = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+                out[misses] = encoded
+                for i, row in enumerate(rows):
+                    if row is not None:
+                        out[i] = np.frombuffer(row, dtype=np.float32)
+            
+            with self._embed_cache_lock:
+                for i, vec in zip(misses, encoded):
+                    self._embed_cache[keys[i]] = vec.tobytes()
+                while len(self._embed_cache) > self.EMBED_CACHE_SIZE:
+                    self._embed_cache.popitem(last=False)
+            return out
         except Exception as e:
-            logger.error(f"Error generating embedding: {e}")
+            logger.error(f"Error generating embeddings: {e}")
             return None
     
+    @staticmethod
+    def embedding_to_storage(vec) -> str:
+        """
+        Serialize unit-normalized embeddings (as the encoder returns them) to base64
+        int8 bytes: one vector as 'q8:', an (n, dim) chunk matrix as 'q8m:<dim>:'.
+        """
+        rows = np.asarray(vec, dtype=np.float32)
+        payload = base64.b64encode(_quantize(rows).tobytes()).decode('ascii')
+        if rows.ndim == 2:
+            return f"{_Q8M_PREFIX}{rows.shape[1]}:{payload}"
+        return _Q8_PREFIX + payload
+    
+    @staticmethod
+    def _chunk_text(content: str, max_chars: int = 1000, overlap: int = 128) -> List[str]:
+        """
+        Split text into ~max_chars chunks on sentence boundaries (about 256 MiniLM
+        tokens), carrying up to `overlap` trailing characters into the next chunk.
+        """
+        chunks: List[str] = []
+        current = ''
+        for sentence in _SENTENCE_END.split(content):
+            while len(sentence) > max_chars:
+                # A single over-long "sentence" (tables, no punctuation) is hard-split
+                sentence_head, sentence = sentence[:max_chars], sentence[max_chars - overlap:]
+                if current:
+                    chunks.append(current)
+                    current = ''
+                chunks.append(sentence_head)
+            if current and len(current) + len(sentence) + 1 > max_chars:
+                chunks.append(current)
+                current = current[-overlap:]
+            current = f"{current} {sentence}" if current else sentence
+        if current.strip():
+            chunks.append(current)
+        return chunks
+    
+    def migrate_embeddings(self, db) -> int:
+        """Repack JSON-list and float32 document embeddings into the int8 storage format."""
+        if not HAS_NUMPY:
+            return 0
+        try:
+            rows = db.get_documents_with_legacy_embeddings()
+            if rows:
+                db.update_document_embeddings([
+                    (self.embedding_to_storage(_decode_embedding(row['embeddings']) / _Q8_SCALE), row['id'])
+                    for row in rows
+                ])
+                logger.info(f"Repacked {len(rows)} legacy document embeddings")
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error migrating document embeddings: {e}")
+            return 0
+    
+    def _query_embedding(self, query: str):
+        """
+        Return the float32 query vector (read-only, cached per engine), or None if
+        embedding failed; failures are retried on the next call.
+        """
+        with self._query_cache_lock:
+            vec = self._query_cache.get(query)
+            if vec is not None:
+                self._query_cache.move_to_end(query)
+                return vec
+        
+        vec = self.generate_embeddings(query)
+        if vec is None:
+            return None
+        # The encoder already L2-normalizes, so similarity is a plain dot product
+        vec = np.array(vec, dtype=np.float32)
+        vec.setflags(write=False)
+        with self._query_cache_lock:
+            self._query_cache[query] = vec
+            if len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return vec
+    
     def semantic_search(self, query: str, documents: List[Dict], top_k: int = 5) -> List[Dict]:
         """
         Perform semantic search on documents.
@@ -223,32 +821,130 @@ Try AI-powered features like conversations and email summaries later.
             return documents[:top_k]
         
         try:
-            query_embedding = self.generate_embeddings(query)
-            if not query_embedding:
+            query_vec = self._query_embedding(query)
+            if query_vec is None:
                 return documents[:top_k]
             
-            scored_docs = []
-            for doc in documents:
-                if doc.get('embeddings'):
-                    doc_embedding = json.loads(doc['embeddings'])
-                    similarity = self._cosine_similarity(query_embedding, doc_embedding)
-                    scored_docs.append({**doc, 'similarity': similarity})
+            candidates = [doc for doc in documents if doc.get('embeddings')]
+            if not candidates:
+                return []
+            
+            matrix, starts = _stack_embeddings(candidates)
+            query_q8 = _quantize(query_vec)
+            # Rows and query are unit vectors, so cosine is the dot product; no norms per query
+            if HAS_SIMSIMD:
+                # One SIMD kernel call (AVX2/AVX-512/NEON int8) over the whole matrix
+                dots = np.asarray(simsimd.cdist(query_q8[None, :], matrix, metric='dot'))[0]
+            elif _dot_rows_kernel() is not None:
+                # JIT-compiled, vectorized and parallel over rows
+                dots = _dot_rows_kernel()(matrix, query_q8)
+            else:
+                # One integer matmul; int32 accumulation since 384 * 127^2 overflows int16
+                dots = matrix @ query_q8.astype(np.int32)
+            # A document scores as its best-matching chunk
+            sims = np.maximum.reduceat(dots, starts) / (_Q8_SCALE * _Q8_SCALE)
             
-            # Sort by similarity and return top_k
-            scored_docs.sort(key=lambda x: x.get('similarity', 0), reverse=True)
-            return scored_docs[:top_k]
+            if top_k <= 0:
+                return []
+            if top_k < len(sims):
+                # O(N) quickselect; result dicts are built for the winners only
+                top = np.argpartition(-sims, top_k - 1)[:top_k]
+            else:
+                top = np.arange(len(sims))
+            top = top[np.argsort(-sims[top])]
+            return [{**candidates[i], 'similarity': float(sims[i])} for i in top]
             
         except Exception as e:
             logger.error(f"Error in semantic search: {e}")
             return documents[:top_k]
     
-    def _cosine_similarity(self, a: List[float], b: List[float]) -> float:
-        """Cosine similarity disabled for memory optimization."""
-        return 0.0
+    @staticmethod
+    def _speech_only(audio):
+        """
+        Concatenate the speech regions (Silero VAD) of a 16 kHz mono waveform
+        using the ONNX VAD bundled with faster-whisper; returns the audio
+        unchanged when faster-whisper is not installed.
+        """
+        if not HAS_FASTER_WHISPER:
+            return audio
+        try:
+            from faster_whisper.vad import get_speech_timestamps
+            stamps = get_speech_timestamps(audio)
+        except Exception as e:
+            logger.warning(f"VAD unavailable, transcribing full audio: {e}")
+            return audio
+        if not stamps:
+            return audio[:0]
+        return np.concatenate([audio[stamp['start']:stamp['end']] for stamp in stamps])
+    
+    @staticmethod
+    def _load_openai_whisper():
+        """
+        Load the reference Whisper "base" model; on CPU, dynamically quantize its
+        Linear layers to int8 (fbgemm/qnnpack GEMM) to halve memory and speed decoding.
+        """
+        import torch
+        import whisper.model
+        
+        if torch.cuda.is_available():
+            return whisper.load_model("base")
+        # Whisper's own Linear subclass is skipped by quantize_dynamic; load with nn.Linear
+        original_linear = whisper.model.Linear
+        whisper.model.Linear = torch.nn.Linear
+        try:
+            model = whisper.load_model("base", device="cpu")
+        finally:
+            whisper.model.Linear = original_linear
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    
+    @staticmethod
+    def _whisper_device() -> str:
+        """Resolve WHISPER_DEVICE (default auto) to 'cuda' when CTranslate2 sees a GPU, else 'cpu'."""
+        device = os.getenv('WHISPER_DEVICE', 'auto').lower()
+        if device != 'auto':
+            return device
+        try:
+            import ctranslate2
+            return 'cuda' if ctranslate2.get_cuda_device_count() > 0 else 'cpu'
+        except Exception:
+            return 'cpu'
+    
+    @staticmethod
+    def _whisper_model_source() -> str:
+        """
+        Pick the faster-whisper model: WHISPER_MODEL (size name or converted
+        CTranslate2 directory), else a pre-converted data/models/whisper-base-int8,
+        else the "base" weights downloaded once into data/models.
+        """
+        configured = os.getenv('WHISPER_MODEL')
+        if configured:
+            return configured
+        converted = os.path.join(_DATA_DIR, 'models', 'whisper-base-int8')
+        if os.path.isfile(os.path.join(converted, 'model.bin')):
+            return converted
+        return "base"
     
     def transcribe_audio(self, audio_path: str) -> Tuple[str, bool]:
-        """Audio transcription disabled for memory optimization."""
-        return "Audio transcription disabled for memory optimization. Please send text messages only.", False
+        """Transcribe audio with the model loaded at startup."""
+        if not self.whisper_model:
+            return "Audio transcription disabled for memory optimization. Please send text messages only.", False
+        
+        try:
+            if self.whisper_backend == 'ctranslate2':
+                # VAD drops silence before decoding; greedy search is enough for voice notes
+                segments, _info = self.whisper_model.transcribe(audio_path, vad_filter=True, beam_size=1)
+                text = ''.join(seg.text for seg in segments).strip()
+            else:
+                import whisper
+                # Decode only the speech; silence costs 30 s windows and invites hallucinated text
+                audio = self._speech_only(whisper.load_audio(audio_path))
+                # Half precision on GPU; fp16 on CPU only triggers a warning and an fp32 fallback
+                fp16 = self.whisper_model.device.type == 'cuda'
+                text = self.whisper_model.transcribe(audio, fp16=fp16)['text'].strip() if audio.size else ''
+            return text, True
+        except Exception as e:
+            logger.error(f"Error transcribing audio: {e}")
+            return f"Sorry, I couldn't transcribe that audio: {e}", False
     
     def generate_image(self, prompt: str, size: str = "1024x1024") -> Optional[str]:
         """
@@ -261,77 +957,12 @@ Try AI-powered features like conversations and email summaries later.
             # Gemini image generation path
             if self.llm_provider == 'gemini' and self.gemini_keys:
                 model_id = os.getenv('GEMINI_IMAGE_MODEL', 'gemini-2.5-flash-image-preview')
-                last_err = None
-                for key in self.gemini_keys:
-                    try:
-                        genai.configure(api_key=key)
-                        model = genai.GenerativeModel(model_id)
-                        # Request binary image if supported
-                        try:
-                            response = model.generate_content(
-                                prompt,
-                                generation_config={"response_mime_type": "image/png"}
-                            )
-                        except Exception:
-                            response = model.generate_content(prompt)
-                        
-                        # Extract inline image bytes from candidates parts
-                        image_bytes = None
-                        try:
-                            candidates = getattr(response, 'candidates', []) or []
-                            for cand in candidates:
-                                content = getattr(cand, 'content', None)
-                                parts = getattr(content, 'parts', []) if content else []
-                                for part in parts:
-                                    inline = getattr(part, 'inline_data', None)
-                                    if inline is None and isinstance(part, dict):
-                                        inline = part.get('inline_data')
-                                    if not inline:
-                                        continue
-                                    data = getattr(inline, 'data', None)
-                                    if data is None and isinstance(inline, dict):
-                                        data = inline.get('data')
-                                    if not data:
-                                        continue
-                                    if isinstance(data, (bytes, bytearray)):
-                                        image_bytes = bytes(data)
-                                        break
-                                    else:
-                                        import base64
-                                        try:
-                                            image_bytes = base64.b64decode(data)
-                                            break
-                                        except Exception:
-                                            continue
-                                if image_bytes:
-                                    break
-                        except Exception:
-                            image_bytes = None
-                        
-                        if image_bytes:
-                            out_dir = os.path.join(os.path.dirname(__file__), '..', 'data', 'documents', 'generated')
-                            os.makedirs(out_dir, exist_ok=True)
-                            filename = f"gemini_img_{int(datetime.now().timestamp())}.png"
-                            out_path = os.path.join(out_dir, filename)
-                            with open(out_path, 'wb') as f:
-                                f.write(image_bytes)
-                            return out_path
-                        # No inline image: return text URL if provided
-                        try:
-                            text = (getattr(response, 'text', None) or '').strip()
-                            if text and text.startswith('http'):
-                                return text
-                        except Exception:
-                            pass
-                        # If we reached here, this key produced no usable output; try next
-                        last_err = RuntimeError("No image bytes or URL in response")
-                        continue
-                    except Exception as e:
-                        last_err = e
-                        continue
-                # All keys failed
-                logger.error(f"Gemini image generation failed across keys: {last_err}")
-                return None
+                try:
+                    return self._with_key_rotation(lambda key: self._gemini_image(key, model_id, prompt))
+                except Exception as e:
+                    # All keys failed
+                    logger.error(f"Gemini image generation failed across keys: {e}")
+                    return None
 
             # OpenAI fallback
             if self.llm_provider == 'openai' and self.openai_api_key:
@@ -347,6 +978,72 @@ Try AI-powered features like conversations and email summaries later.
             logger.error(f"Error generating image: {e}")
             return None
     
+    def _gemini_image(self, key: str, model_id: str, prompt: str) -> str:
+        """Generate one image with a single key; returns a file path or URL, raises otherwise."""
+        model = self._gemini_model_for(key, model_id)
+        # Request binary image if supported
+        try:
+            response = model.generate_content(
+                prompt,
+                generation_config={"response_mime_type": "image/png"}
+            )
+        except Exception:
+            response = model.generate_content(prompt)
+        
+        image_bytes = self._extract_inline_png(response)
+        
+        if image_bytes:
+            # Nanosecond stamp keeps bursty generations from colliding
+            filename = f"gemini_img_{time.time_ns()}.png"
+            out_path = os.path.join(self.generated_path, filename)
+            # Single large write; skip the buffered file layer
+            fd = os.open(out_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(image_bytes)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+            return out_path
+        # No inline image: return text URL if provided
+        try:
+            text = (getattr(response, 'text', None) or '').strip()
+            if text and text.startswith('http'):
+                return text
+        except Exception:
+            pass
+        # This key produced no usable output; let the caller try the next one
+        raise RuntimeError("No image bytes or URL in response")
+    
+    @staticmethod
+    def _extract_inline_png(response) -> Optional[bytes]:
+        """Return the first inline image payload in a Gemini response, decoded to bytes."""
+        try:
+            parts = (
+                part
+                for cand in (getattr(response, 'candidates', None) or [])
+                for part in (getattr(getattr(cand, 'content', None), 'parts', None) or [])
+            )
+            inlines = (
+                getattr(part, 'inline_data', None) or (part.get('inline_data') if isinstance(part, dict) else None)
+                for part in parts
+            )
+            data = next(
+                (d for d in (
+                    inline.data if hasattr(inline, 'data') else inline.get('data')
+                    for inline in inlines if inline
+                ) if d),
+                None
+            )
+            if data is None:
+                return None
+            if isinstance(data, str):
+                return a2b_base64(data)
+            # The SDK usually hands back raw bytes already; don't copy them
+            return data if isinstance(data, (bytes, bytearray)) else bytes(data)
+        except Exception:
+            return None
+    
     def download_media(self, url: str, media_type: str = 'video') -> Optional[str]:
         """
         Download media from URL using yt-dlp.
@@ -363,24 +1060,28 @@ Try AI-powered features like conversations and email summaries later.
             return None
             
         try:
-            import os
+            # Configure yt-dlp options; HLS/DASH fragments download in parallel
+            ydl_opts = {
+                'outtmpl': os.path.join(self.documents_path, '%(title)s.%(ext)s'),
+                'noplaylist': True,
+                'quiet': True,
+                'concurrent_fragment_downloads': 8,
+            }
+            if shutil.which('aria2c'):
+                ydl_opts['external_downloader'] = 'aria2c'
+                ydl_opts['external_downloader_args'] = ['-x', '16', '-k', '1M']
             
-            # Configure yt-dlp options
             if media_type == "audio":
-                ydl_opts = {
-                    'format': 'bestaudio/best',
-                    'outtmpl': os.path.join(self.documents_path, '%(title)s.%(ext)s'),
+                ydl_opts.update({
+                    'format': 'bestaudio[ext=m4a]/bestaudio/best',
                     'postprocessors': [{
                         'key': 'FFmpegExtractAudio',
                         'preferredcodec': 'mp3',
                         'preferredquality': '192',
                     }],
-                }
+                })
             else:
-                ydl_opts = {
-                    'format': 'best[height<=720]',
-                    'outtmpl': os.path.join(self.documents_path, '%(title)s.%(ext)s'),
-                }
+                ydl_opts['format'] = 'best[height<=720]'
             
             # Download with yt-dlp
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
@@ -410,23 +1111,23 @@ Try AI-powered features like conversations and email summaries later.
         Returns:
             Dict: Analysis results
         """
-        if not HAS_PIL:
-            logger.warning("PIL not available for image processing")
-            return None
-            
         try:
-            # Open and analyze image
-            with Image.open(image_path) as img:
-                # Get basic info
-                info = {
-                    "format": img.format,
-                    "mode": img.mode,
-                    "size": img.size,
-                    "width": img.width,
-                    "height": img.height
-                }
-                
-                return info
+            # PNG/JPEG/WebP dimensions come from a few header bytes; PIL handles the rest
+            header = _read_image_header(image_path)
+            if header is None:
+                if not HAS_PIL:
+                    logger.warning("PIL not available for image processing")
+                    return None
+                with Image.open(image_path) as img:
+                    header = (img.format, img.mode, img.size)
+            image_format, mode, size = header
+            return {
+                "format": image_format,
+                "mode": mode,
+                "size": size,
+                "width": size[0],
+                "height": size[1]
+            }
         except Exception as e:
             logger.error(f"Error analyzing image: {e}")
             return {'error': str(e)}
@@ -442,35 +1143,92 @@ Try AI-powered features like conversations and email summaries later.
         Returns:
             Dict: Processing result
         """
-        try:
-            # Save file
-            filename = f"{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-            file_path = os.path.join(self.documents_path, filename)
-            file.save(file_path)
-            
-            # Extract text content
-            content = self._extract_text_from_file(file_path)
-            
-            # Generate embeddings
-            embeddings = None
-            if content and self.embedding_model:
-                embeddings = self.generate_embeddings(content[:1000])  # First 1000 chars
-            
-            # Generate summary
-            summary = self._generate_summary(content) if content else "No content extracted"
-            
-            return {
-                'success': True,
-                'filename': filename,
-                'file_path': file_path,
-                'content_length': len(content) if content else 0,
-                'summary': summary,
-                'embeddings': json.dumps(embeddings) if embeddings else None
-            }
+        return self.add_documents([file], user_id)[0]
+    
+    def add_documents(self, files: List[Any], user_id: str) -> List[Dict]:
+        """
+        Process several uploads, embedding all of their heads in one batched encode.
+        
+        Returns:
+            List[Dict]: One processing result per file, in input order
+        """
+        results: List[Dict] = []
+        contents: List[Optional[str]] = []
+        for file in files:
+            try:
+                # Save file
+                filename = f"{user_id}_{time.strftime('%Y%m%d_%H%M%S')}_{file.filename}"
+                file_path = os.path.join(self.documents_path, filename)
+                self._save_upload(getattr(file, 'stream', file), file_path)
+                
+                # Extract text content
+                content = self._extract_text_from_file(file_path)
+                results.append({
+                    'success': True,
+                    'filename': filename,
+                    'file_path': file_path,
+                    'content_length': len(content) if content else 0,
+                    'embeddings': None
+                })
+                contents.append(content)
+            except Exception as e:
+                logger.error(f"Error processing document: {e}")
+                results.append({'success': False, 'error': str(e)})
+                contents.append(None)
+        
+        for result, content in zip(results, contents):
+            if result['success']:
+                result['summary'] = self._generate_summary(content) if content else "No content extracted"
+        
+        # Embed every document's chunks in one batch
+        embedded = [i for i, content in enumerate(contents) if content]
+        chunk_lists = [self._chunk_text(contents[i])[:self.MAX_EMBED_CHUNKS] for i in embedded]
+        embeddings = None
+        if embedded and self.embedding_model:
+            all_chunks = [chunk for chunks in chunk_lists for chunk in chunks]
+            embeddings = self.generate_embeddings_batch(all_chunks, 32)
+        if embeddings is not None:
+            start = 0
+            for i, chunks in zip(embedded, chunk_lists):
+                if chunks:
+                    results[i]['embeddings'] = self.embedding_to_storage(embeddings[start:start + len(chunks)])
+                start += len(chunks)
+        
+        return results
+    
+    @staticmethod
+    def _save_upload(stream, file_path: str) -> None:
+        """
+        Copy an upload to disk without holding it in memory.
+        On Linux, uploads already spooled to a real file go through os.sendfile;
+        anything else (or a failed sendfile) is copied in 1 MiB blocks.
+        """
+        with open(file_path, 'wb', buffering=0) as out:
+            # Only Linux sendfile takes a regular file as output, and fileno() on an
+            # in-memory SpooledTemporaryFile would roll it over to disk first
+            if sys.platform.startswith('linux') and getattr(stream, '_rolled', True):
+                try:
+                    start = stream.tell()
+                    src_fd = stream.fileno()
+                    offset, remaining = start, os.fstat(src_fd).st_size - start
+                except (AttributeError, OSError, ValueError):
+                    start = None
+                if start is not None:
+                    try:
+                        while remaining > 0:
+                            sent = os.sendfile(out.fileno(), src_fd, offset, remaining)
+                            if sent == 0:
+                                break
+                            offset += sent
+                            remaining -= sent
+                        return
+                    except OSError as e:
+                        logger.debug(f"sendfile failed, copying upload instead: {e}")
+                        stream.seek(start)
+                        out.seek(0)
+                        out.truncate()
             
-        except Exception as e:
-            logger.error(f"Error processing document: {e}")
-            return {'success': False, 'error': str(e)}
+            shutil.copyfileobj(stream, out, length=1 << 20)
     
     def _extract_text_from_file(self, file_path: str) -> Optional[str]:
         """Extract text from various file formats."""
@@ -478,50 +1236,108 @@ Try AI-powered features like conversations and email summaries later.
             file_ext = os.path.splitext(file_path)[1].lower()
             
             if file_ext == '.pdf':
-                import PyPDF2
-                with open(file_path, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    text = ""
-                    for page in reader.pages:
-                        text += page.extract_text()
-                    return text
+                return self._extract_pdf_text(file_path)
             
             elif file_ext in ['.txt', '.md']:
                 with open(file_path, 'r', encoding='utf-8') as file:
                     return file.read()
             
             elif file_ext in ['.docx']:
-                try:
-                    from docx import Document
-                    doc = Document(file_path)
-                    return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-                except ImportError:
+                if not HAS_DOCX:
                     logger.warning("python-docx not installed, cannot process .docx files")
                     return None
+                doc = DocxDocument(file_path)
+                return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
             
         except Exception as e:
             logger.error(f"Error extracting text from {file_path}: {e}")
             return None
     
+    def _extract_pdf_text(self, file_path: str) -> str:
+        """Extract PDF text page by page, stopping once MAX_EXTRACT_CHARS is reached."""
+        parts = []
+        total = 0
+        if HAS_PDFIUM:
+            pdf = pypdfium2.PdfDocument(file_path)
+            try:
+                for i in range(len(pdf)):
+                    page = pdf[i]
+                    textpage = page.get_textpage()
+                    try:
+                        parts.append(textpage.get_text_range())
+                    finally:
+                        textpage.close()
+                        page.close()
+                    total += len(parts[-1])
+                    if total > self.MAX_EXTRACT_CHARS:
+                        break
+            finally:
+                pdf.close()
+        elif HAS_PYMUPDF:
+            # MuPDF is not thread-safe, so pages are read sequentially in C
+            doc = fitz.open(file_path)
+            try:
+                for page in doc:
+                    parts.append(page.get_text("text"))
+                    total += len(parts[-1])
+                    if total > self.MAX_EXTRACT_CHARS:
+                        break
+            finally:
+                doc.close()
+        elif HAS_PYPDF2:
+            with open(file_path, 'rb') as file:
+                reader = PyPDF2.PdfReader(file)
+                for page in reader.pages:
+                    parts.append(page.extract_text() or '')
+                    total += len(parts[-1])
+                    if total > self.MAX_EXTRACT_CHARS:
+                        break
+        else:
+            logger.warning("No PDF library installed, cannot process .pdf files")
+        return ''.join(parts)
+    
     def _generate_summary(self, content: str, max_length: int = 200) -> str:
         """Generate summary of content."""
         if not content:
             return "No content to summarize"
         
-        # Simple extractive summary - take first few sentences
-        sentences = content.split('. ')
-        summary = '. '.join(sentences[:3])
+        # Simple extractive summary - take first few sentences, scanning only the prefix
+        end = 0
+        for _ in range(3):
+            idx = content.find('. ', end)
+            if idx == -1:
+                end = len(content)
+                break
+            end = idx + 2
+        summary = content[:end].rstrip()
         
         if len(summary) > max_length:
             summary = summary[:max_length] + "..."
         
         return summary
     
-    def health_check(self) -> bool:
-        """Check AI engine health."""
+    def health_check(self, deep: bool = False) -> bool:
+        """
+        Check AI engine health.
+        
+        The default check is local: credentials are configured and the loaded
+        models are usable. deep=True also makes a real LLM call, at most once
+        per HEALTH_TTL seconds.
+        """
         try:
-            # Test LLM
+            # Only inspect models that are already loaded; a probe must not trigger a load
+            embedding_model = self.__dict__.get('embedding_model')
+            healthy = bool(self.gemini_keys or self.openai_api_key) and (
+                embedding_model is None or hasattr(embedding_model, 'encode')
+            )
+            if not healthy or not deep:
+                return healthy
+            
+            if time.monotonic() - self._last_health_ok < self.HEALTH_TTL:
+                return True
             test_response = self.generate_response("Hello", max_tokens=10)
+            if test_response:
+                self._last_health_ok = time.monotonic()
             return bool(test_response)
         except Exception as e:
             logger.error(f"AI engine health check failed: {e}")
@@ -1,7 +1,8 @@
-import google.generativeai as genai
 import os
+import asyncio
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from functools import cached_property, lru_cache
+from typing import Optional, Dict, Any, Tuple
 
 # Speech recognition disabled for memory optimization
 HAS_SPEECH_RECOGNITION = False
@@ -9,87 +10,333 @@ HAS_PYDUB = False
 sr = None
 AudioSegment = None
 
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+    tiktoken = None
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+    ahocorasick = None
+
+try:
+    import blingfire
+    HAS_BLINGFIRE = True
+except ImportError:
+    HAS_BLINGFIRE = False
+    blingfire = None
+
+try:
+    from blake3 import blake3
+    HAS_BLAKE3 = True
+except ImportError:
+    HAS_BLAKE3 = False
+    blake3 = None
+
+try:
+    import dateparser
+    HAS_DATEPARSER = True
+except ImportError:
+    HAS_DATEPARSER = False
+    dateparser = None
+
+import hashlib
+import json
+import pickle
+import shutil
+import string
 import tempfile
-from .utils import PDFReader
-from .web_tools import WebTools
-from .advanced_features import CalculatorTools, TaskScheduler, ImageAnalyzer, TextAnalyzer
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import re
-import requests
 
 # Load environment variables
 load_dotenv()
 
+class _FilenameTable(dict):
+    """str.translate table keeping [A-Za-z0-9_-] and mapping every other character to '_'."""
+    def __missing__(self, codepoint):
+        return '_'
+
+_FILENAME_TABLE = _FilenameTable({ord(c): c for c in string.ascii_letters + string.digits + '_-'})
+
+_BASE_SYSTEM_PROMPT = """You are Jarvis, a personal AI assistant for Badmus Qudus Ayomide (the creator).\n        - Always refer to yourself as Jarvis.\n        - Never mention underlying providers or models (e.g., Gemini, OpenAI).\n        - Be concise, helpful, and motivating when appropriate.\n        - Remember prior preferences and conversation context when available.\n        - Offer practical, actionable steps.\n        - If unsure, say so briefly and propose next steps."""
+
+_DEFAULT_FALLBACK = """🤖 **AI Processing Temporarily Limited**
+
+I can still help you with:
+
+✅ **Social Media:**
+• "tech quote" - Post inspiration
+• "post to twitter: your message"
+
+✅ **Downloads:**
+• Send YouTube, TikTok, Instagram links
+
+✅ **Commands:**
+• /help - Full command list
+• /status - System status
+• /reminders - Your reminders
+
+🔄 **Full AI chat will return soon!**"""
+
+# (keywords, reply) checked in order; the first keyword found in the message wins
+FALLBACK_TABLE = (
+    (('hello', 'hi', 'hey'), "👋 Hello! I'm having some AI processing issues right now, but I can still help with:\n\n• Social media: 'tech quote'\n• Downloads: Send YouTube/TikTok links\n• Commands: /help, /status"),
+    (('weather',), "🌤️ Weather service temporarily unavailable. Try again later or use /help for other features."),
+    (('news',), "📰 News service temporarily unavailable. Try again later or use /help for other features."),
+    # This should be handled by social media manager
+    (('tech quote',), "💡 Use the exact phrase 'tech quote' to post inspiration!"),
+)
+
+# Patterns used on every message, compiled once at import
+_MATH_EXPR = re.compile(r'[0-9+\-*/().^%√πe\s]+')
+_CONVERT = re.compile(r'convert (\d+(?:\.\d+)?)\s*(\w+)\s*to\s*(\w+)')
+_TRANSLATE = re.compile(r'translate ["\'](.+?)["\'] to (\w+)')
+# Every trigger any special command looks for; a message with none of them skips
+# the whole cascade (most chat traffic)
+_COMMAND_HINT = re.compile(
+    r'weather|news|headlines|[+\-*/=]|calculate|compute|convert|task|remind|search|look up'
+    r'|find information about|crypto|bitcoin|ethereum|translate|download|youtube|tiktok'
+    r'|instagram|facebook|video|audio|analyze text:'
+)
+_WEATHER_PREFIXES = ('weather', "what's the weather", "how's the weather")
+_NEWS_HINT = re.compile(r'\b(?:news|headlines)\b')
+_CLAUSE_SPLIT = re.compile(r'\s+(?:and|&|plus)\s+', re.IGNORECASE)
+# Calculator gate: a char-set test plus two substring checks, before any regex
+_MATH_CHARS = frozenset('+-*/=')
+_MATH_WORDS = ('calculate', 'compute')
+# Keyword gates and the media-URL alternation each take one scan of the message;
+# the matching URL's group name is the platform
+_CRYPTO_TRIGGER = re.compile(r'crypto|bitcoin|ethereum')
+_MEDIA_TRIGGER = re.compile(r'download|youtube|tiktok|instagram|facebook|video|audio')
+_MEDIA_URL = re.compile(
+    r'(?P<YouTube>https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[\w-]+)'
+    r'|(?P<TikTok>https?://(?:www\.)?(?:tiktok\.com|vm\.tiktok\.com|vt\.tiktok\.com)/[\w\-\./\?=&]+)'
+    r'|(?P<Instagram>https?://(?:www\.)?instagram\.com/(?:p|reel|tv)/[\w-]+/?)'
+    r'|(?P<Facebook>https?://(?:www\.)?(?:facebook\.com|fb\.watch)/[\w\-\./\?=&]+)'
+)
+# One pass over the message; each alternative captures a (task, time) group pair and
+# only "remind me to" may omit the time
+_REMINDER = re.compile(
+    r'remind me to (.+?)(?: (?:by|at|on) (.+))?$'
+    r'|reminder (?:to )?(.+?) (?:by|at|on) (.+)'
+    r'|set (?:a )?reminder (?:for|to) (.+?) (?:by|at|on) (.+)'
+    r'|schedule (.+?) (?:for|at) (.+)',
+    re.MULTILINE
+)
+_REMINDER_TIME_PATTERNS = tuple(re.compile(p) for p in (
+    r'(?:by|at|on) (.+)',
+    r'(\d{1,2}(?::\d{2})?\s*(?:am|pm|AM|PM))',
+    r'(today|tomorrow|tonight)',
+))
+_NEWS_CATEGORIES = ('technology', 'science', 'business', 'world', 'general')
+_WORD = re.compile(r'[a-z]+')
+# Markdown code fence a model may wrap a JSON reply in
+_CODE_FENCE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$')
+# Skipped when indexing and querying the knowledge base
+_STOPWORDS = frozenset(
+    'a an and are as at be but by for from has have how i in is it its me my of on or '
+    'so that the their this to was what when where which who why will with you your'.split()
+)
+_CLOCK_TIME = re.compile(r'(\d{1,2}(?::\d{2})?\s*(?:am|pm))')
+_RELATIVE_TIME = re.compile(r'in (\d+)\s*(minute|hour|day)s?')
+
+@lru_cache(maxsize=1)
+def _word_chunk_kernel():
+    """numba word-boundary scan over UTF-8 bytes, or None without numba (imported on first use)."""
+    try:
+        import numba
+        import numpy as np
+    except ImportError:
+        return None
+    
+    @numba.njit(cache=True)
+    def word_chunk_bounds(buf, step):
+        """
+        Byte offsets splitting UTF-8 text into runs of `step` whitespace-separated
+        words: 0, the start of word step, word 2*step, ..., len(buf).
+        """
+        bounds = np.empty(buf.shape[0] // (2 * step) + 2, dtype=np.int64)
+        bounds[0] = 0
+        n = 1
+        words = 0
+        in_word = False
+        for i in range(buf.shape[0]):
+            c = buf[i]
+            if c == 32 or (c >= 9 and c <= 13):
+                in_word = False
+            elif not in_word:
+                in_word = True
+                if words > 0 and words % step == 0:
+                    bounds[n] = i
+                    n += 1
+                words += 1
+        bounds[n] = buf.shape[0]
+        return bounds[:n + 1]
+    
+    return lambda raw, step: word_chunk_bounds(np.frombuffer(raw, dtype=np.uint8), step)
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    """cl100k_base BPE (close to Gemini's token counts), or None without tiktoken."""
+    if not HAS_TIKTOKEN:
+        return None
+    try:
+        # First use fetches the BPE ranks once and caches them on disk
+        return tiktoken.get_encoding('cl100k_base')
+    except Exception as e:
+        print(f"tiktoken encoding unavailable, chunking by words: {e}")
+        return None
+
+def _build_fallback_automaton():
+    """Aho-Corasick automaton mapping every FALLBACK_TABLE keyword to its row index."""
+    automaton = ahocorasick.Automaton()
+    for row, (keywords, _reply) in enumerate(FALLBACK_TABLE):
+        for word in keywords:
+            automaton.add_word(word, row)
+    automaton.make_automaton()
+    return automaton
+
+_FALLBACK_AUTOMATON = _build_fallback_automaton() if HAS_AHOCORASICK else None
+
+@lru_cache(maxsize=1024)
+def _fallback_reply(message_lower: str) -> str:
+    """Canned reply for a lower-cased, stripped message."""
+    if _FALLBACK_AUTOMATON is not None:
+        # One pass finds every keyword; the earliest table row wins
+        row = min((row for _end, row in _FALLBACK_AUTOMATON.iter(message_lower)), default=None)
+        return FALLBACK_TABLE[row][1] if row is not None else _DEFAULT_FALLBACK
+    for keywords, reply in FALLBACK_TABLE:
+        if any(word in message_lower for word in keywords):
+            return reply
+    return _DEFAULT_FALLBACK
+
+def _knowledge_note(knowledge_context: str) -> str:
+    """Knowledge-base excerpts framed for the model."""
+    return f"Relevant information from your knowledge base:\n{knowledge_context}\n\nUse this information to provide more accurate and detailed responses when relevant."
+
+@lru_cache(maxsize=256)
+def _system_prompt(knowledge_context: str) -> str:
+    """System prompt with optional knowledge-base context appended."""
+    if knowledge_context:
+        return _BASE_SYSTEM_PROMPT + "\n\n" + _knowledge_note(knowledge_context)
+    return _BASE_SYSTEM_PROMPT
+
 class JarvisAssistant:
     """
     Core AI Assistant class that handles all AI-related functionality.
     This is platform-independent and can be used with any messaging service.
     """
     
+    # Exact-prompt replies and summaries (in-process cap without Redis)
+    RESPONSE_CACHE_SIZE = 512
+    
+    # Concurrent per-chunk summary requests (kept low for the Gemini per-minute quota)
+    SUMMARY_WORKERS = 4
+    
+    # Extracted PDF texts kept in memory, keyed by (path, mtime, size)
+    PDF_TEXT_CACHE_SIZE = 64
+    
+    # Chat batching (CHAT_BATCHING=1): a user's short messages arriving within
+    # CHAT_BATCH_WINDOW seconds are answered with one Gemini call
+    CHAT_BATCHING = os.getenv('CHAT_BATCHING', 'false').lower() in ('1', 'true', 'yes')
+    CHAT_BATCH_WINDOW = 0.25
+    CHAT_BATCH_SIZE = 8
+    CHAT_BATCH_MAX_CHARS = 200
+    
+    # Knowledge-base search: opt-in (KNOWLEDGE_BASE_SEARCH=1), served from an
+    # inverted index persisted next to the documents
+    KB_INDEX_FILE = 'kb_index.pkl'
+    KB_EXCERPT_WORDS = 50
+    KB_INDEX_WORKERS = min(8, os.cpu_count() or 1)
+    
     def __init__(self):
-        # Configure Gemini
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        self.pdf_reader = PDFReader()
+        # Gemini, the PDF reader and the tools are imported and built on first use
+        # (see the cached properties below) to keep startup memory and time down
         
         # Speech recognition and TTS disabled for memory optimization
         self.recognizer = None
             
         self.knowledge_base_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'knowledge_base')
-        
-        # Initialize new tools
-        self.web_tools = WebTools()
-        self.calculator = CalculatorTools()
-        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-        self.task_scheduler = TaskScheduler(data_dir)
-        self.image_analyzer = ImageAnalyzer()
-        self.text_analyzer = TextAnalyzer()
+        self.data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
         
         # Ensure directories exist
         os.makedirs(self.knowledge_base_path, exist_ok=True)
-        os.makedirs(data_dir, exist_ok=True)
+        os.makedirs(self.data_dir, exist_ok=True)
         
+        self._pdf_text_cache: OrderedDict = OrderedDict()
+        self._pdf_text_lock = threading.Lock()
+        self._kb_index = None
+        self._kb_lock = threading.Lock()
+        self._chat_batches: Dict[Any, list] = {}
+        self._chat_batch_timers: Dict[Any, asyncio.Task] = {}
+        # Strong references to in-flight flushes; the event loop only keeps weak ones
+        self._chat_batch_tasks: set = set()
+    
+    @cached_property
+    def model(self):
+        """Gemini model bound to GEMINI_API_KEY, built on first use."""
+        from .ai_engine import _gemini_model
+        return _gemini_model(os.getenv('GEMINI_API_KEY'), 'gemini-1.5-flash')
+    
+    @cached_property
+    def chat_model(self):
+        """
+        Gemini model carrying the Jarvis prompt as its system_instruction, so every chat
+        request starts with the same prefix; None on SDKs without system_instruction.
+        """
+        from .ai_engine import _gemini_model
+        try:
+            return _gemini_model(os.getenv('GEMINI_API_KEY'), 'gemini-1.5-flash',
+                                 system_instruction=_BASE_SYSTEM_PROMPT)
+        except TypeError:
+            return None
+    
+    @cached_property
+    def pdf_reader(self):
+        from .utils import PDFReader
+        return PDFReader()
     
-    def get_fallback_response(self, message: str) -> str:
+    @cached_property
+    def web_tools(self):
+        from .web_tools import WebTools
+        return WebTools()
+    
+    @cached_property
+    def calculator(self):
+        from .advanced_features import CalculatorTools
+        return CalculatorTools()
+    
+    @cached_property
+    def task_scheduler(self):
+        from .advanced_features import TaskScheduler
+        return TaskScheduler(self.data_dir)
+    
+    @cached_property
+    def image_analyzer(self):
+        from .advanced_features import ImageAnalyzer
+        return ImageAnalyzer()
+    
+    @cached_property
+    def text_analyzer(self):
+        from .advanced_features import TextAnalyzer
+        return TextAnalyzer()
+    
+    def get_fallback_response(self, message: str, message_lower: str = None) -> str:
         """
         Get fallback response when AI is unavailable.
+        message_lower may carry the caller's already lower-cased, stripped message.
         # fallback_responses_added - marker for fix detection
         """
-        message_lower = message.lower().strip()
-        
-        # Handle common queries without AI
-        if any(word in message_lower for word in ['hello', 'hi', 'hey']):
-            return "👋 Hello! I'm having some AI processing issues right now, but I can still help with:\n\n• Social media: 'tech quote'\n• Downloads: Send YouTube/TikTok links\n• Commands: /help, /status"
-        
-        elif any(word in message_lower for word in ['weather']):
-            return "🌤️ Weather service temporarily unavailable. Try again later or use /help for other features."
-        
-        elif any(word in message_lower for word in ['news']):
-            return "📰 News service temporarily unavailable. Try again later or use /help for other features."
-        
-        elif 'tech quote' in message_lower:
-            # This should be handled by social media manager
-            return "💡 Use the exact phrase 'tech quote' to post inspiration!"
-        
-        else:
-            return """🤖 **AI Processing Temporarily Limited**
-
-I can still help you with:
-
-✅ **Social Media:**
-• "tech quote" - Post inspiration
-• "post to twitter: your message"
-
-✅ **Downloads:**
-• Send YouTube, TikTok, Instagram links
-
-✅ **Commands:**
-• /help - Full command list
-• /status - System status
-• /reminders - Your reminders
-
-🔄 **Full AI chat will return soon!**"""
+        return _fallback_reply(message_lower if message_lower is not None else message.lower().strip())
 
     def generate_image_file(self, prompt: str) -> Optional[str]:
         """
@@ -97,9 +344,9 @@ I can still help you with:
         Uses AIEngine.generate_image (OpenAI DALL·E if configured). If a URL is returned, downloads it.
         Returns local file path or None.
         """
+        part_path = None
         try:
-            from .ai_engine import AIEngine
-            engine = AIEngine()
+            engine = self.ai_engine
             result = engine.generate_image(prompt)
             if not result:
                 return None
@@ -109,73 +356,210 @@ I can still help you with:
             # Otherwise, assume it's a URL; download to data/documents/generated
             out_dir = os.path.join(os.path.dirname(__file__), '..', 'data', 'documents', 'generated')
             os.makedirs(out_dir, exist_ok=True)
-            filename = re.sub(r'[^a-zA-Z0-9_-]+', '_', prompt.strip())[:40] or 'image'
+            # Runs of unsafe characters collapse to a single '_'
+            parts = prompt.strip().translate(_FILENAME_TABLE).split('_')
+            filename = '_'.join(part for part in parts if part)[:40] or 'image'
             out_path = os.path.join(out_dir, f"{filename}.png")
-            resp = requests.get(result, timeout=30)
-            if resp.status_code == 200:
-                with open(out_path, 'wb') as f:
-                    f.write(resp.content)
-                return out_path
-            return None
+            # identity encoding lets the raw socket stream go straight to disk in 64 KB
+            # blocks; the .part rename keeps a failed download from leaving a broken PNG
+            part_path = out_path + '.part'
+            with engine.http.get(result, timeout=30, stream=True,
+                                 headers={'Accept-Encoding': 'identity'}) as resp:
+                if resp.status_code != 200:
+                    return None
+                # Still decode if the server compresses anyway
+                resp.raw.decode_content = True
+                with open(part_path, 'wb') as f:
+                    shutil.copyfileobj(resp.raw, f, length=65536)
+            os.replace(part_path, out_path)
+            return out_path
         except Exception:
+            # Don't leave a half-written download behind
+            if part_path and os.path.exists(part_path):
+                try:
+                    os.remove(part_path)
+                except OSError:
+                    pass
             return None
+
     def summarize_pdf(self, file_path: str, max_chars: int = 1200) -> str:
         """
         Extract text from a PDF and generate a concise summary.
         Falls back to a simple extractive summary if LLM fails.
         """
         try:
-            content = self.pdf_reader.extract_text(file_path)
+            content = self._extract_pdf_text(file_path)
             if not content:
                 return "I couldn't extract readable text from this PDF."
             # For large documents, chunk then summarize each chunk, then synthesize
-            chunks = self._chunk_text(content, max_words_per_chunk=1000)
-            chunk_summaries = []
-            for idx, chunk in enumerate(chunks, 1):
-                prompt = (
-                    "You are a professional document summarizer. Your goal is to create a concise, "
-                    "easy-to-read summary of the provided text. The summary must capture the main ideas and key details. "
-                    "Do not include any information that is not in the original text.\n\n"
-                    f"Text (chunk {idx}/{len(chunks)}):\n{chunk}\n\n"
-                    "Return 3-6 bullet points. Keep each bullet to one sentence."
-                )
-                summary_text = self._llm_summarize(prompt)
-                if summary_text:
-                    chunk_summaries.append(summary_text)
-            # If we have multiple chunk summaries, synthesize a final concise summary
+            chunks = self._chunk_text(content)
+            return self._finish_summary(chunks, self._summarize_chunks(chunks), max_chars)
+        except Exception as e:
+            return f"Error summarizing PDF: {e}"
+
+    async def summarize_pdf_async(self, file_path: str, max_chars: int = 1200) -> str:
+        """
+        Async variant of summarize_pdf for event-loop callers: chunk summaries run as
+        concurrent awaitables (at most SUMMARY_WORKERS in flight), then the synthesis.
+        """
+        try:
+            # PDF parsing is CPU work; keep it off the event loop
+            content = await asyncio.to_thread(self._extract_pdf_text, file_path)
+            if not content:
+                return "I couldn't extract readable text from this PDF."
+            chunks = await asyncio.to_thread(self._chunk_text, content)
+            limit = asyncio.Semaphore(self.SUMMARY_WORKERS)
+
+            async def summarize(prompt: str) -> str | None:
+                async with limit:
+                    return await self._llm_summarize_async(prompt)
+
+            results = await asyncio.gather(*(summarize(p) for p in self._chunk_summary_prompts(chunks)))
+            chunk_summaries = [text for text in results if text]
             if chunk_summaries:
-                synthesis_prompt = (
-                    "You are a professional document summarizer. Merge the bullet points below into a single, "
-                    "clean summary with 5-7 bullets, no redundancy, preserving only information present in the bullets.\n\n"
-                    "Bullets to merge:\n" + "\n".join(chunk_summaries)
-                )
-                final_summary = self._llm_summarize(synthesis_prompt)
+                final_summary = await self._llm_summarize_async(self._synthesis_prompt(chunk_summaries))
                 if final_summary:
-                    # Trim to soft limit
-                    final_summary = final_summary.strip()
-                    if len(final_summary) > max_chars:
-                        final_summary = final_summary[:max_chars] + "..."
-                    return final_summary
-            # Fallback simple extractive summary on first chunk
-            first = chunks[0] if chunks else content
-            sentences = first.split('. ')
-            fallback = '\n'.join([f"- {s.strip()}" for s in sentences[:5] if s.strip()])
-            if not fallback:
-                fallback = first[:max_chars]
-            if len(fallback) > max_chars:
-                fallback = fallback[:max_chars] + "..."
-            return fallback
+                    return self._trim_summary(final_summary, max_chars)
+            return self._extractive_summary(chunks, max_chars)
         except Exception as e:
             return f"Error summarizing PDF: {e}"
 
-    def _chunk_text(self, text: str, max_words_per_chunk: int = 1000) -> list[str]:
-        """Split large text into word-based chunks to fit LLM limits."""
+    def _extract_pdf_text(self, file_path: str) -> str:
+        """
+        PDF text, served from an in-process LRU while the file's mtime and size are
+        unchanged, then from the on-disk cache (see _read_pdf_text).
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return self._read_pdf_text(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        with self._pdf_text_lock:
+            content = self._pdf_text_cache.get(key)
+            if content is not None:
+                self._pdf_text_cache.move_to_end(key)
+                return content
+        
+        content = self._read_pdf_text(file_path)
+        if content:
+            with self._pdf_text_lock:
+                self._pdf_text_cache[key] = content
+                if len(self._pdf_text_cache) > self.PDF_TEXT_CACHE_SIZE:
+                    self._pdf_text_cache.popitem(last=False)
+        return content
+
+    def _read_pdf_text(self, file_path: str) -> str:
+        """
+        PDF text, cached on disk under data/cache/pdf_text by a hash of the file's bytes
+        so re-uploads and retries skip extraction.
+        """
+        try:
+            digest = blake3() if HAS_BLAKE3 else hashlib.blake2b(digest_size=32)
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            cache_path = os.path.join(self.data_dir, 'cache', 'pdf_text', f"{digest.hexdigest()}.txt")
+            if os.path.exists(cache_path):
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    return f.read()
+        except OSError as e:
+            print(f"PDF text cache unavailable: {e}")
+            return self.pdf_reader.extract_text(file_path)
+
+        content = self.pdf_reader.extract_text(file_path)
+        if content:
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                # Write then rename so a concurrent reader never sees a partial file
+                part_path = f"{cache_path}.{threading.get_ident()}.part"
+                with open(part_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(part_path, cache_path)
+            except OSError as e:
+                print(f"Could not cache PDF text: {e}")
+        return content
+
+    def _chunk_summary_prompts(self, chunks: list[str]) -> list[str]:
+        """Per-chunk bullet-summary prompts."""
+        return [
+            "You are a professional document summarizer. Your goal is to create a concise, "
+            "easy-to-read summary of the provided text. The summary must capture the main ideas and key details. "
+            "Do not include any information that is not in the original text.\n\n"
+            f"Text (chunk {idx}/{len(chunks)}):\n{chunk}\n\n"
+            "Return 3-6 bullet points. Keep each bullet to one sentence."
+            for idx, chunk in enumerate(chunks, 1)
+        ]
+
+    def _summarize_chunks(self, chunks: list[str]) -> list[str]:
+        """Summarize chunks with concurrent interactive calls, in document order."""
+        prompts = self._chunk_summary_prompts(chunks)
+        # Chunk summaries are independent network calls; map() keeps document order
+        with ThreadPoolExecutor(max_workers=min(self.SUMMARY_WORKERS, len(prompts))) as pool:
+            return [text for text in pool.map(self._llm_summarize, prompts) if text]
+
+    def _finish_summary(self, chunks: list[str], chunk_summaries: list[str], max_chars: int) -> str:
+        """Merge chunk summaries into the final summary, or fall back to an extractive one."""
+        # If we have multiple chunk summaries, synthesize a final concise summary
+        if chunk_summaries:
+            final_summary = self._llm_summarize(self._synthesis_prompt(chunk_summaries))
+            if final_summary:
+                return self._trim_summary(final_summary, max_chars)
+        return self._extractive_summary(chunks, max_chars)
+
+    @staticmethod
+    def _synthesis_prompt(chunk_summaries: list[str]) -> str:
+        """Prompt merging per-chunk bullets into the final summary."""
+        return (
+            "You are a professional document summarizer. Merge the bullet points below into a single, "
+            "clean summary with 5-7 bullets, no redundancy, preserving only information present in the bullets.\n\n"
+            "Bullets to merge:\n" + "\n".join(chunk_summaries)
+        )
+
+    @staticmethod
+    def _trim_summary(summary: str, max_chars: int) -> str:
+        """Trim to soft limit."""
+        summary = summary.strip()
+        if len(summary) > max_chars:
+            summary = summary[:max_chars] + "..."
+        return summary
+
+    @staticmethod
+    def _extractive_summary(chunks: list[str], max_chars: int) -> str:
+        """Fallback simple extractive summary on the first chunk."""
+        first = chunks[0]
+        if HAS_BLINGFIRE:
+            # C finite-state splitter; handles "Dr.", "e.g." and decimals
+            sentences = blingfire.text_to_sentences(first).split('\n')
+        else:
+            sentences = first.split('. ')
+        fallback = '\n'.join([f"- {s.strip()}" for s in sentences[:5] if s.strip()])
+        if not fallback:
+            fallback = first[:max_chars]
+        if len(fallback) > max_chars:
+            fallback = fallback[:max_chars] + "..."
+        return fallback
+
+    def _chunk_text(self, text: str, max_tokens: int = 3000) -> list[str]:
+        """
+        Split large text into windows of max_tokens tokens to fit LLM limits.
+        Without tiktoken, falls back to windows of about as many words (0.75 per token),
+        found by a numba byte scan when numba is installed.
+        """
         try:
-            words = text.split()
-            chunks = []
-            for i in range(0, len(words), max_words_per_chunk):
-                chunk_words = words[i:i + max_words_per_chunk]
-                chunks.append(' '.join(chunk_words))
+            encoding = _token_encoding()
+            if encoding is not None:
+                tokens = encoding.encode_ordinary(text)
+                chunks = [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+            elif _word_chunk_kernel() is not None:
+                # One compiled pass over the bytes; chunks are slices of the original text
+                raw = text.encode('utf-8')
+                bounds = _word_chunk_kernel()(raw, max_tokens * 3 // 4)
+                chunks = [raw[start:end].decode('utf-8').strip() for start, end in zip(bounds[:-1], bounds[1:])]
+                chunks = [chunk for chunk in chunks if chunk]
+            else:
+                words = text.split()
+                step = max_tokens * 3 // 4
+                chunks = [' '.join(words[i:i + step]) for i in range(0, len(words), step)]
             return chunks if chunks else [text]
         except Exception:
             return [text]
@@ -183,12 +567,76 @@ I can still help you with:
     def _llm_summarize(self, prompt: str) -> str | None:
         """Call the configured LLM to summarize; return None on failure."""
         try:
-            response = self.model.generate_content(prompt)
-            text = (response.text or '').strip()
+            return self._cached_generate(prompt) or None
+        except Exception:
+            return None
+
+    async def _llm_summarize_async(self, prompt: str) -> str | None:
+        """
+        Async _llm_summarize with the same exact-prompt cache. Goes through the shared
+        AIEngine, which rotates through every configured Gemini key.
+        """
+        try:
+            cached = await asyncio.to_thread(self._cached_reply, prompt)
+            if cached is not None:
+                return cached
+            text = (await self.ai_engine.agenerate(prompt) or '').strip()
+            await asyncio.to_thread(self._store_reply, prompt, text)
             return text or None
         except Exception:
             return None
 
+    @cached_property
+    def ai_engine(self):
+        """AIEngine shared by every assistant in the process, built on first use."""
+        from .ai_engine import AIEngine, _shared_model
+        return _shared_model('ai-engine', AIEngine)
+
+    @cached_property
+    def _response_cache(self):
+        """
+        Exact-prompt reply cache shared by every assistant in the process (Redis when
+        REDIS_URL is set), or None unless RESPONSE_CACHE is on.
+        """
+        if os.getenv('RESPONSE_CACHE', 'false').lower() not in ('1', 'true', 'yes'):
+            return None
+        from .ai_engine import _shared_model
+        from .cache import ResponseCache
+        return _shared_model('assistant-response-cache',
+                             lambda: ResponseCache(max_entries=self.RESPONSE_CACHE_SIZE))
+
+    def _cached_generate(self, prompt: str, model=None, contents=None) -> str:
+        """
+        Generate with Gemini, reusing the answer to an identical prompt.
+        `model` and `contents`, when given, are what is actually sent; the cache is
+        always keyed on `prompt`.
+        """
+        cached = self._cached_reply(prompt)
+        if cached is not None:
+            return cached
+        
+        response = (model or self.model).generate_content(prompt if contents is None else contents)
+        text = (response.text or '').strip()
+        self._store_reply(prompt, text)
+        return text
+    
+    @staticmethod
+    def _reply_cache_key(prompt: str) -> str:
+        """Response-cache key for an exact prompt."""
+        return f"reply:{hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest()}"
+    
+    def _cached_reply(self, prompt: str) -> Optional[str]:
+        """Reply cached for this exact prompt, or None (also when RESPONSE_CACHE is off)."""
+        if self._response_cache is None:
+            return None
+        return self._response_cache.get(self._reply_cache_key(prompt))
+    
+    def _store_reply(self, prompt: str, text: str) -> None:
+        """Cache a non-empty reply for this exact prompt when RESPONSE_CACHE is on."""
+        if self._response_cache is not None and text:
+            self._response_cache.set(self._reply_cache_key(prompt), text,
+                                     int(os.getenv('RESPONSE_CACHE_TTL', '3600')))
+
     def process_text_message(self, message: str, user_context: Optional[Dict] = None) -> str:
         """
         Process a text message and return AI response.
@@ -202,27 +650,154 @@ I can still help you with:
         """
         try:
             # Check for special commands first
-            special_response = self._handle_special_commands(message)
+            special_response = self._handle_special_commands(message, message.lower().strip())
             if special_response:
                 return special_response
+            return self._generate_reply(message)
             
-            # Check if message relates to knowledge base
-            knowledge_context = self._search_knowledge_base(message)
-            
-            # Prepare system prompt
-            system_prompt = self._build_system_prompt(knowledge_context)
-            
-            # Combine system prompt and user message for Gemini
-            full_prompt = f"{system_prompt}\n\nUser: {message}\n\nAssistant:"
-            
-            # Generate response using Gemini
-            response = self.model.generate_content(full_prompt)
-            
-            return response.text.strip()
+        except Exception as e:
+            return f"I apologize, but I encountered an error processing your message: {str(e)}"
+    
+    async def process_text_message_async(self, message: str, user_context: Optional[Dict] = None) -> str:
+        """Async process_text_message; web lookups share one pooled aiohttp session."""
+        try:
+            special_response = await self._handle_special_commands_async(message, message.lower().strip())
+            if special_response:
+                return special_response
+            return await asyncio.to_thread(self._generate_reply, message)
             
         except Exception as e:
             return f"I apologize, but I encountered an error processing your message: {str(e)}"
     
+    async def process_text_message_batched(self, message: str, user_id: Any,
+                                           user_context: Optional[Dict] = None) -> str:
+        """
+        process_text_message_async that, with CHAT_BATCHING on, holds a user's short
+        chat messages for CHAT_BATCH_WINDOW seconds (up to CHAT_BATCH_SIZE) and answers
+        them with one Gemini call. Commands and long messages are answered right away.
+        """
+        if not self.CHAT_BATCHING or len(message) > self.CHAT_BATCH_MAX_CHARS:
+            return await self.process_text_message_async(message, user_context)
+        try:
+            special_response = await self._handle_special_commands_async(message, message.lower().strip())
+            if special_response:
+                return special_response
+        except Exception as e:
+            return f"I apologize, but I encountered an error processing your message: {str(e)}"
+        
+        future = asyncio.get_running_loop().create_future()
+        pending = self._chat_batches.setdefault(user_id, [])
+        pending.append((message, future))
+        if len(pending) == 1:
+            self._chat_batch_timers[user_id] = self._track_chat_batch_task(
+                self._flush_chat_batch(user_id, self.CHAT_BATCH_WINDOW)
+            )
+        elif len(pending) == self.CHAT_BATCH_SIZE:
+            # Full: take it now so later messages start a new batch, and stop the
+            # window timer from flushing that one early
+            del self._chat_batches[user_id]
+            timer = self._chat_batch_timers.pop(user_id, None)
+            if timer is not None:
+                timer.cancel()
+            self._track_chat_batch_task(self._answer_chat_batch(pending))
+        return await future
+    
+    def _track_chat_batch_task(self, coro) -> asyncio.Task:
+        """Start coro as a task, holding a reference to it until it finishes."""
+        task = asyncio.create_task(coro)
+        self._chat_batch_tasks.add(task)
+        task.add_done_callback(self._chat_batch_tasks.discard)
+        return task
+    
+    async def _flush_chat_batch(self, user_id: Any, delay: float) -> None:
+        """Answer everything queued for user_id after `delay` seconds."""
+        await asyncio.sleep(delay)
+        if self._chat_batch_timers.get(user_id) is asyncio.current_task():
+            del self._chat_batch_timers[user_id]
+        batch = self._chat_batches.pop(user_id, None)
+        if batch:
+            await self._answer_chat_batch(batch)
+    
+    async def _answer_chat_batch(self, batch: list) -> None:
+        """Resolve each (message, future) pair in batch with its reply."""
+        messages = [message for message, _ in batch]
+        try:
+            if len(messages) == 1:
+                replies = [await asyncio.to_thread(self._generate_reply, messages[0])]
+            else:
+                replies = await asyncio.to_thread(self._generate_batch_reply, messages)
+        except Exception as e:
+            replies = [f"I apologize, but I encountered an error processing your message: {str(e)}"] * len(batch)
+        for (_, future), reply in zip(batch, replies):
+            if not future.done():
+                future.set_result(reply)
+    
+    def _generate_batch_reply(self, messages: list[str]) -> list[str]:
+        """
+        Replies to several messages, built from the same prompts and reply cache as
+        _generate_reply. Uncached messages share one Gemini call; if its answer is not
+        a JSON array of one string per message, each is answered on its own.
+        """
+        prompts = [self._reply_prompt(message) for message in messages]
+        replies = [self._cached_reply(full_prompt) for full_prompt, _ in prompts]
+        todo = [i for i, reply in enumerate(replies) if reply is None]
+        if len(todo) > 1:
+            answers = self._batch_answers([messages[i] for i in todo], [prompts[i][1] for i in todo])
+            for i, answer in zip(todo, answers or ()):
+                replies[i] = answer
+                self._store_reply(prompts[i][0], answer)
+        return [
+            reply if reply is not None else self._reply_for_prompt(message, *prompts[i])
+            for i, (message, reply) in enumerate(zip(messages, replies))
+        ]
+    
+    def _batch_answers(self, messages: list[str], knowledge: list[str]) -> Optional[list[str]]:
+        """One Gemini call answering every message, or None if the reply is malformed."""
+        items = [
+            {'message': message, **({'knowledge': context} if context else {})}
+            for message, context in zip(messages, knowledge)
+        ]
+        prompt = ("Answer each message in this JSON array independently, using its 'knowledge' "
+                  "field when present. Reply with only a JSON array of exactly "
+                  f"{len(items)} strings: the answers, in the same order.\n\n"
+                  f"{json.dumps(items, ensure_ascii=False)}")
+        if self.chat_model is not None:
+            text = self.chat_model.generate_content(prompt).text or ''
+        else:
+            text = self.model.generate_content(f"{self._build_system_prompt()}\n\n{prompt}").text or ''
+        
+        try:
+            answers = json.loads(_CODE_FENCE.sub('', text))
+        except ValueError:
+            return None
+        if (not isinstance(answers, list) or len(answers) != len(messages)
+                or not all(isinstance(answer, str) and answer.strip() for answer in answers)):
+            return None
+        return [answer.strip() for answer in answers]
+    
+    def _reply_prompt(self, message: str) -> Tuple[str, str]:
+        """(full prompt the reply cache is keyed on, knowledge-base context) for a chat message."""
+        # Check if message relates to knowledge base
+        knowledge_context = self._search_knowledge_base(message)
+        
+        # Prepare system prompt
+        system_prompt = self._build_system_prompt(knowledge_context)
+        
+        # Combine system prompt and user message for Gemini
+        return f"{system_prompt}\n\nUser: {message}\n\nAssistant:", knowledge_context
+    
+    def _generate_reply(self, message: str) -> str:
+        """Answer a non-command message with the LLM, grounded in the knowledge base."""
+        return self._reply_for_prompt(message, *self._reply_prompt(message))
+    
+    def _reply_for_prompt(self, message: str, full_prompt: str, knowledge_context: str) -> str:
+        """Generate (or reuse a cached) reply for a prompt built by _reply_prompt."""
+        if self.chat_model is None:
+            return self._cached_generate(full_prompt)
+        # Knowledge-base excerpts go in as their own part so the system instruction never changes
+        contents = [_knowledge_note(knowledge_context), message] if knowledge_context else message
+        return self._cached_generate(full_prompt, model=self.chat_model, contents=contents)
+    
     def process_voice_message(self, audio_file_path: str) -> tuple[str, str]:
         """Voice processing disabled for memory optimization."""
         return "Voice processing disabled.", "Please send text messages only. Voice features are disabled to optimize memory usage."
@@ -236,8 +811,100 @@ I can still help you with:
         return None
     
     def _search_knowledge_base(self, query: str) -> str:
-        """Advanced document search disabled for memory optimization."""
-        return ""
+        """
+        Excerpts from up to three knowledge-base PDFs matching the query.
+        Disabled unless KNOWLEDGE_BASE_SEARCH is set, to keep memory down.
+        """
+        if os.getenv('KNOWLEDGE_BASE_SEARCH', 'false').lower() not in ('1', 'true', 'yes'):
+            return ""
+        tokens = set(_WORD.findall(query.lower())) - _STOPWORDS
+        if not tokens:
+            return ""
+        
+        try:
+            index = self._load_kb_index()
+        except Exception as e:
+            print(f"Error searching knowledge base: {e}")
+            return ""
+        
+        # Files matching the most query terms first; excerpt around the rarest term they contain
+        postings = {token: index['postings'][token] for token in tokens if token in index['postings']}
+        hits: Dict[str, list] = {}
+        for token in sorted(postings, key=lambda t: len(postings[t])):
+            for filename, offsets in postings[token].items():
+                hits.setdefault(filename, []).append(offsets[0])
+        
+        relevant_content = []
+        for filename in sorted(hits, key=lambda name: -len(hits[name])):
+            words, offset = index['words'][filename], hits[filename][0]
+            excerpt = ' '.join(words[max(0, offset - self.KB_EXCERPT_WORDS):offset + self.KB_EXCERPT_WORDS])
+            relevant_content.append(f"From {filename}:\n{excerpt}")
+        return "\n\n".join(relevant_content[:3])
+    
+    def _load_kb_index(self) -> Dict[str, Any]:
+        """
+        Inverted index over the knowledge-base PDFs: token -> {filename: [word offsets]},
+        plus each file's words and mtime. Persisted in data/kb_index.pkl; only files whose
+        mtime changed are re-tokenized.
+        """
+        with self._kb_lock:
+            index = self._kb_index
+            index_path = os.path.join(self.data_dir, self.KB_INDEX_FILE)
+            if index is None:
+                try:
+                    with open(index_path, 'rb') as f:
+                        index = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    index = {'mtimes': {}, 'words': {}, 'postings': {}}
+            
+            mtimes = {
+                entry.name: entry.stat().st_mtime_ns
+                for entry in os.scandir(self.knowledge_base_path)
+                if entry.is_file() and entry.name.lower().endswith('.pdf')
+            }
+            stale = [name for name in index['mtimes'] if mtimes.get(name) != index['mtimes'][name]]
+            fresh = [name for name in mtimes if index['mtimes'].get(name) != mtimes[name]]
+            if stale or fresh:
+                postings = index['postings']
+                for name in stale:
+                    # One regex pass over the whole text; offsets are not needed here
+                    tokens = set(_WORD.findall(' '.join(index['words'].pop(name)).lower())) - _STOPWORDS
+                    for token in tokens:
+                        postings[token].pop(name, None)
+                        if not postings[token]:
+                            del postings[token]
+                    del index['mtimes'][name]
+                paths = [os.path.join(self.knowledge_base_path, name) for name in fresh]
+                # Reading, hashing and parsing the changed files overlap across threads
+                with ThreadPoolExecutor(max_workers=max(1, min(self.KB_INDEX_WORKERS, len(paths)))) as pool:
+                    texts = list(pool.map(self._extract_pdf_text, paths))
+                for name, text in zip(fresh, texts):
+                    words = text.split()
+                    for token, offset in self._kb_tokens(text.lower().split()):
+                        postings.setdefault(token, {}).setdefault(name, []).append(offset)
+                    index['words'][name] = words
+                    index['mtimes'][name] = mtimes[name]
+                
+                try:
+                    part_path = f"{index_path}.{threading.get_ident()}.part"
+                    with open(part_path, 'wb') as f:
+                        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(part_path, index_path)
+                except OSError as e:
+                    print(f"Could not save knowledge-base index: {e}")
+            
+            self._kb_index = index
+            return index
+    
+    @staticmethod
+    def _kb_tokens(words: list) -> list:
+        """(token, word offset) pairs of an already lower-cased word list, stopwords dropped."""
+        return [
+            (token, offset)
+            for offset, word in enumerate(words)
+            for token in _WORD.findall(word)
+            if token not in _STOPWORDS
+        ]
     
     def _build_system_prompt(self, knowledge_context: str = "") -> str:
         """
@@ -249,53 +916,38 @@ I can still help you with:
         Returns:
             str: Complete system prompt
         """
-        base_prompt = """You are Jarvis, a personal AI assistant for Badmus Qudus Ayomide (the creator).\n        - Always refer to yourself as Jarvis.\n        - Never mention underlying providers or models (e.g., Gemini, OpenAI).\n        - Be concise, helpful, and motivating when appropriate.\n        - Remember prior preferences and conversation context when available.\n        - Offer practical, actionable steps.\n        - If unsure, say so briefly and propose next steps."""
-        
-        if knowledge_context:
-            base_prompt += f"\n\nRelevant information from your knowledge base:\n{knowledge_context}\n\nUse this information to provide more accurate and detailed responses when relevant."
-        
-        return base_prompt
+        return _system_prompt(knowledge_context)
     
-    def _handle_special_commands(self, message: str) -> Optional[str]:
+    def _handle_special_commands(self, message: str, message_lower: str = None) -> Optional[str]:
         """
         Handle special commands and tools.
         
         Args:
             message (str): User message
+            message_lower (str, optional): message.lower().strip(), if the caller has it
             
         Returns:
             str: Response if special command handled, None otherwise
         """
-        message_lower = message.lower().strip()
+        if message_lower is None:
+            message_lower = message.lower().strip()
+        if not _COMMAND_HINT.search(message_lower):
+            return None
         
         # Weather command
-        if message_lower.startswith(('weather', 'what\'s the weather', 'how\'s the weather')):
+        if message_lower.startswith(_WEATHER_PREFIXES):
             location = self._extract_location(message) or 'London'
-            weather = self.web_tools.get_weather(location)
-            if 'error' in weather:
-                return f"Sorry, I couldn't get weather information: {weather['error']}"
-            return f"Weather in {weather['location']}:\n" \
-                   f"🌡️ Temperature: {weather['temperature']}\n" \
-                   f"☁️ Condition: {weather['condition']}\n" \
-                   f"💧 Humidity: {weather['humidity']}\n" \
-                   f"💨 Wind: {weather['wind']}\n" \
-                   f"🌡️ Feels like: {weather['feels_like']}"
+            return self._format_weather(self.web_tools.get_weather(location))
         
         # News command
         if message_lower.startswith(('news', 'latest news', 'headlines')):
-            category = self._extract_news_category(message)
-            headlines = self.web_tools.get_news_headlines(category, 3)
-            if headlines and 'title' in headlines[0]:
-                response = f"📰 Latest {category} news:\n\n"
-                for i, headline in enumerate(headlines, 1):
-                    response += f"{i}. {headline['title']}\n{headline['description'][:100]}...\n\n"
-                return response
-            return "Sorry, I couldn't fetch the latest news right now."
+            category = self._extract_news_category(message, message_lower)
+            return self._format_headlines(category, self.web_tools.get_news_headlines(category, 3))
         
         # Calculator command
-        if any(op in message for op in ['+', '-', '*', '/', '=', 'calculate', 'compute']):
+        if not _MATH_CHARS.isdisjoint(message) or any(word in message for word in _MATH_WORDS):
             # Extract mathematical expression
-            math_match = re.search(r'[0-9+\-*/().^%√πe\s]+', message)
+            math_match = _MATH_EXPR.search(message)
             if math_match:
                 expression = math_match.group().strip()
                 if len(expression) > 2:  # Avoid single characters
@@ -306,7 +958,7 @@ I can still help you with:
                         return f"❌ {result['error']}"
         
         # Unit conversion
-        convert_match = re.search(r'convert (\d+(?:\.\d+)?)\s*(\w+)\s*to\s*(\w+)', message_lower)
+        convert_match = _CONVERT.search(message_lower)
         if convert_match:
             value, from_unit, to_unit = convert_match.groups()
             result = self.calculator.convert_units(float(value), from_unit, to_unit)
@@ -317,7 +969,7 @@ I can still help you with:
         
         # Task management - Natural Language Reminder Processing
         if message_lower.startswith(('add task', 'schedule task', 'remind me', 'reminder')):
-            return self._parse_natural_reminder(message)
+            return self._parse_natural_reminder(message, message_lower=message_lower)
         
         if message_lower.startswith('my tasks') or 'upcoming tasks' in message_lower:
             tasks = self.task_scheduler.get_upcoming_tasks()
@@ -346,7 +998,7 @@ I can still help you with:
                 return f"Sorry, I couldn't find information about '{query}' right now."
         
         # Cryptocurrency prices
-        if 'crypto' in message_lower or 'bitcoin' in message_lower or 'ethereum' in message_lower:
+        if _CRYPTO_TRIGGER.search(message_lower):
             prices = self.web_tools.get_cryptocurrency_prices()
             if 'error' not in prices:
                 response = "💰 Cryptocurrency Prices:\n\n"
@@ -356,7 +1008,7 @@ I can still help you with:
             return "Sorry, I couldn't fetch cryptocurrency prices right now."
         
         # Translation
-        translate_match = re.search(r'translate ["\'](.+?)["\'] to (\w+)', message_lower)
+        translate_match = _TRANSLATE.search(message_lower)
         if translate_match:
             text, target_lang = translate_match.groups()
             translation = self.web_tools.translate_text(text, target_lang)
@@ -365,39 +1017,15 @@ I can still help you with:
             return "Sorry, I couldn't translate that text right now."
         
         # Social Media Download - Enhanced with TikTok, Instagram, YouTube, Facebook
-        if any(keyword in message_lower for keyword in ['download', 'youtube', 'tiktok', 'instagram', 'facebook', 'video', 'audio']):
-            # YouTube URLs
-            youtube_match = re.search(r'(https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[\w-]+)', message)
-            # TikTok URLs
-            tiktok_match = re.search(r'(https?://(?:www\.)?(?:tiktok\.com|vm\.tiktok\.com|vt\.tiktok\.com)/[\w\-\./\?=&]+)', message)
-            # Instagram URLs
-            instagram_match = re.search(r'(https?://(?:www\.)?instagram\.com/(?:p|reel|tv)/[\w-]+/?)', message)
-            # Facebook URLs
-            facebook_match = re.search(r'(https?://(?:www\.)?(?:facebook\.com|fb\.watch)/[\w\-\./\?=&]+)', message)
-            
-            url = None
-            platform = None
-            
-            if youtube_match:
-                url = youtube_match.group(1)
-                platform = "YouTube"
-            elif tiktok_match:
-                url = tiktok_match.group(1)
-                platform = "TikTok"
-            elif instagram_match:
-                url = instagram_match.group(1)
-                platform = "Instagram"
-            elif facebook_match:
-                url = facebook_match.group(1)
-                platform = "Facebook"
-            
-            if url and platform:
+        if _MEDIA_TRIGGER.search(message_lower):
+            media_match = _MEDIA_URL.search(message)
+            if media_match:
+                url = media_match.group()
+                platform = media_match.lastgroup
                 media_type = 'audio' if 'audio' in message_lower else 'video'
                 
                 # Use AI engine's download_media method
-                from .ai_engine import AIEngine
-                ai_engine = AIEngine()
-                result = ai_engine.download_media(url, media_type)
+                result = self.ai_engine.download_media(url, media_type)
                 
                 if result:
                     return f"✅ Successfully downloaded {media_type} from {platform}!\n📁 Saved to: {result}"
@@ -421,6 +1049,49 @@ I can still help you with:
         
         return None
     
+    async def _handle_special_commands_async(self, message: str, message_lower: str = None) -> Optional[str]:
+        """
+        Async variant of _handle_special_commands.
+        A message asking for both weather and news fetches them concurrently;
+        everything else runs the sync handler in a worker thread.
+        """
+        if message_lower is None:
+            message_lower = message.lower().strip()
+        
+        if message_lower.startswith(_WEATHER_PREFIXES) and _NEWS_HINT.search(message_lower):
+            # "weather in NYC and latest news": the location ends at the first conjunction
+            location = _CLAUSE_SPLIT.split(self._extract_location(message) or '', 1)[0] or 'London'
+            category = self._extract_news_category(message, message_lower)
+            weather, headlines = await asyncio.gather(
+                self.web_tools.get_weather_async(location),
+                self.web_tools.get_news_headlines_async(category, 3)
+            )
+            return f"{self._format_weather(weather)}\n\n{self._format_headlines(category, headlines)}"
+        
+        return await asyncio.to_thread(self._handle_special_commands, message, message_lower)
+    
+    @staticmethod
+    def _format_weather(weather: Dict) -> str:
+        """Render a WebTools weather dict as a chat reply."""
+        if 'error' in weather:
+            return f"Sorry, I couldn't get weather information: {weather['error']}"
+        return f"Weather in {weather['location']}:\n" \
+               f"🌡️ Temperature: {weather['temperature']}\n" \
+               f"☁️ Condition: {weather['condition']}\n" \
+               f"💧 Humidity: {weather['humidity']}\n" \
+               f"💨 Wind: {weather['wind']}\n" \
+               f"🌡️ Feels like: {weather['feels_like']}"
+    
+    @staticmethod
+    def _format_headlines(category: str, headlines: list) -> str:
+        """Render WebTools headlines as a chat reply."""
+        if headlines and 'title' in headlines[0]:
+            response = f"📰 Latest {category} news:\n\n"
+            for i, headline in enumerate(headlines, 1):
+                response += f"{i}. {headline['title']}\n{headline['description'][:100]}...\n\n"
+            return response
+        return "Sorry, I couldn't fetch the latest news right now."
+    
     def _extract_location(self, message: str) -> Optional[str]:
         """Extract location from weather query."""
         # Simple location extraction - can be improved
@@ -431,14 +1102,10 @@ I can still help you with:
                     return ' '.join(words[i+1:]).strip('?.,!')
         return None
     
-    def _extract_news_category(self, message: str) -> str:
+    def _extract_news_category(self, message: str, message_lower: str = None) -> str:
         """Extract news category from message."""
-        categories = ['technology', 'science', 'business', 'world', 'general']
-        message_lower = message.lower()
-        for category in categories:
-            if category in message_lower:
-                return category
-        return 'general'
+        words = set(_WORD.findall(message_lower if message_lower is not None else message.lower()))
+        return next((category for category in _NEWS_CATEGORIES if category in words), 'general')
     
     def add_document_to_knowledge_base(self, file_path: str, filename: str) -> bool:
         """
@@ -452,7 +1119,6 @@ I can still help you with:
             bool: True if successful, False otherwise
         """
         try:
-            import shutil
             destination = os.path.join(self.knowledge_base_path, filename)
             shutil.copy2(file_path, destination)
             return True
@@ -460,7 +1126,8 @@ I can still help you with:
             print(f"Error adding document to knowledge base: {e}")
             return False
     
-    def _parse_natural_reminder(self, message: str, user_id: int = None, scheduler_manager=None) -> str:
+    def _parse_natural_reminder(self, message: str, user_id: int = None, scheduler_manager=None,
+                                message_lower: str = None) -> str:
         """
         Parse natural language reminder requests and create reminders.
         
@@ -470,43 +1137,29 @@ I can still help you with:
         - "Set a reminder for meeting at 3:00 PM"
         """
         try:
-            from datetime import datetime, timedelta
-            import re
-            
-            message_lower = message.lower().strip()
-            
-            # Extract the task/reminder text
-            task_patterns = [
-                r'remind me to (.+?) (?:by|at|on) (.+)',
-                r'remind me to (.+)',
-                r'reminder (?:to )?(.+?) (?:by|at|on) (.+)',
-                r'set (?:a )?reminder (?:for|to) (.+?) (?:by|at|on) (.+)',
-                r'schedule (.+?) (?:for|at) (.+)'
-            ]
+            if message_lower is None:
+                message_lower = message.lower().strip()
             
             task_text = None
             time_text = None
             
-            for pattern in task_patterns:
-                match = re.search(pattern, message_lower)
-                if match:
-                    if len(match.groups()) == 2:
-                        task_text = match.group(1).strip()
-                        time_text = match.group(2).strip()
-                    else:
-                        task_text = match.group(1).strip()
-                        # Extract time from the rest of the message
-                        time_patterns = [
-                            r'(?:by|at|on) (.+)',
-                            r'(\d{1,2}(?::\d{2})?\s*(?:am|pm|AM|PM))',
-                            r'(today|tomorrow|tonight)',
-                        ]
-                        for time_pattern in time_patterns:
-                            time_match = re.search(time_pattern, message_lower)
-                            if time_match:
-                                time_text = time_match.group(1).strip()
-                                break
-                    break
+            # Extract the task/reminder text
+            match = _REMINDER.search(message_lower)
+            if match:
+                groups = match.groups()
+                task_text, time_text = next(
+                    (task, when) for task, when in zip(groups[::2], groups[1::2]) if task is not None
+                )
+                task_text = task_text.strip()
+                if time_text is not None:
+                    time_text = time_text.strip()
+                else:
+                    # Extract time from the rest of the message
+                    for time_pattern in _REMINDER_TIME_PATTERNS:
+                        time_match = time_pattern.search(message_lower)
+                        if time_match:
+                            time_text = time_match.group(1).strip()
+                            break
             
             if not task_text:
                 return "I couldn't understand what you want to be reminded about. Please try: 'Remind me to [task] by [time]'"
@@ -553,18 +1206,22 @@ I can still help you with:
         Parse various time expressions into datetime objects.
         """
         try:
-            from datetime import datetime, timedelta
-            import re
-            
             if not time_text:
                 return None
                 
             time_text = time_text.lower().strip()
             now = datetime.now()
             
+            # One dateparser pass covers most phrasings; bare "today"/"tomorrow" keep
+            # the defaults below, and past or unparsed times fall through to the patterns
+            if HAS_DATEPARSER and time_text not in ('today', 'tomorrow'):
+                parsed = dateparser.parse(time_text, settings={'PREFER_DATES_FROM': 'future', 'RELATIVE_BASE': now})
+                if parsed and parsed > now:
+                    return parsed
+            
             # Handle "today" with time
             if 'today' in time_text:
-                time_match = re.search(r'(\d{1,2}(?::\d{2})?\s*(?:am|pm))', time_text)
+                time_match = _CLOCK_TIME.search(time_text)
                 if time_match:
                     time_str = time_match.group(1)
                     try:
@@ -581,7 +1238,7 @@ I can still help you with:
             
             # Handle "tomorrow" with time
             if 'tomorrow' in time_text:
-                time_match = re.search(r'(\d{1,2}(?::\d{2})?\s*(?:am|pm))', time_text)
+                time_match = _CLOCK_TIME.search(time_text)
                 if time_match:
                     time_str = time_match.group(1)
                     try:
@@ -599,7 +1256,7 @@ I can still help you with:
                     return tomorrow.replace(hour=9, minute=0, second=0, microsecond=0)
             
             # Handle specific times (e.g., "2:30 PM", "1:30pm")
-            time_match = re.search(r'(\d{1,2}(?::\d{2})?\s*(?:am|pm))', time_text)
+            time_match = _CLOCK_TIME.search(time_text)
             if time_match:
                 time_str = time_match.group(1)
                 try:
@@ -619,7 +1276,7 @@ I can still help you with:
                     pass
             
             # Handle relative times ("in 30 minutes", "in 2 hours")
-            relative_match = re.search(r'in (\d+)\s*(minute|hour|day)s?', time_text)
+            relative_match = _RELATIVE_TIME.search(time_text)
             if relative_match:
                 amount = int(relative_match.group(1))
                 unit = relative_match.group(2)
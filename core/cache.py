@@ -0,0 +1,170 @@
+import os
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+    redis = None
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Small cache-aside store for serialized API responses.
+    Uses Redis when REDIS_URL is set, otherwise an in-process TTL dict holding at
+    most `max_entries` keys (expired entries purged, then the oldest write evicted).
+    Groups of keys are invalidated by embedding a version() in them and bumping it.
+    """
+
+    def __init__(self, redis_url: str = None, max_entries: int = 1024):
+        redis_url = redis_url or os.getenv('REDIS_URL')
+        self.max_entries = max_entries
+        self.client = None
+        self._local: Dict[str, Tuple[float, str]] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if redis_url and HAS_REDIS:
+            try:
+                pool = redis.ConnectionPool.from_url(redis_url)
+                self.client = redis.Redis(connection_pool=pool)
+                self.client.ping()
+                logger.info("Response cache using Redis")
+            except Exception as e:
+                logger.warning(f"Redis unavailable, using in-process cache: {e}")
+                self.client = None
+        elif redis_url:
+            logger.warning("REDIS_URL set but redis package not installed; using in-process cache")
+
+    @property
+    def shared(self) -> bool:
+        """True when entries and versions live in Redis and are seen by every worker process."""
+        return self.client is not None
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None if missing/expired."""
+        if self.client is not None:
+            try:
+                value = self.client.get(key)
+                return value.decode('utf-8') if value is not None else None
+            except Exception as e:
+                logger.warning(f"Cache get failed for {key}: {e}")
+                return None
+
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        """Store value under key for ttl seconds."""
+        if self.client is not None:
+            try:
+                self.client.setex(key, ttl, value)
+            except Exception as e:
+                logger.warning(f"Cache set failed for {key}: {e}")
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self._local.pop(key, None)
+            if len(self._local) >= self.max_entries:
+                for stale in [k for k, (expires_at, _) in self._local.items() if expires_at < now]:
+                    del self._local[stale]
+                if len(self._local) >= self.max_entries:
+                    del self._local[next(iter(self._local))]
+            self._local[key] = (now + ttl, value)
+
+    def version(self, name: str) -> int:
+        """Current value of the named version counter (0 if never bumped)."""
+        if self.client is not None:
+            try:
+                value = self.client.get(f"ver:{name}")
+                return int(value) if value is not None else 0
+            except Exception as e:
+                logger.warning(f"Cache version read failed for {name}: {e}")
+                return 0
+        
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def bump_version(self, name: str) -> None:
+        """Advance a version counter so keys built from the old value are no longer read."""
+        if self.client is not None:
+            try:
+                self.client.incr(f"ver:{name}")
+            except Exception as e:
+                logger.warning(f"Cache version bump failed for {name}: {e}")
+            return
+        
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+class SemanticCache:
+    """
+    In-process cache of LLM responses keyed by prompt embedding.
+    A lookup hits when a stored prompt in the same scope (e.g. a user id) has
+    cosine similarity to the query of at least `threshold`; entries expire after
+    `ttl` seconds and the least recently used entry is evicted once `capacity`
+    is reached. Expects unit-normalized float32 embeddings.
+    """
+
+    def __init__(self, capacity: int = 2048, threshold: float = 0.92, ttl: int = 3600):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self._matrix = None
+        self._responses: List[Optional[str]] = [None] * capacity
+        self._scopes = np.full(capacity, None, dtype=object) if HAS_NUMPY else None
+        self._expires = np.zeros(capacity, dtype=np.float64) if HAS_NUMPY else None
+        self._last_used = np.zeros(capacity, dtype=np.float64) if HAS_NUMPY else None
+        self._lock = threading.Lock()
+
+    def get(self, embedding, scope: str = None) -> Optional[str]:
+        """Return the cached response for the most similar live prompt in scope, or None."""
+        if not HAS_NUMPY or self._matrix is None:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            sims = self._matrix @ embedding
+            sims[(self._expires < now) | (self._scopes != scope)] = -1.0
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+            self._last_used[best] = now
+            return self._responses[best]
+
+    def set(self, embedding, response: str, scope: str = None) -> None:
+        """Store response under (embedding, scope), replacing an expired or the least recently used slot."""
+        if not HAS_NUMPY:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.capacity, embedding.shape[0]), dtype=np.float32)
+            # Expired and never-used slots have the oldest timestamps
+            slot = int(np.argmin(np.where(self._expires < now, -np.inf, self._last_used)))
+            self._matrix[slot] = embedding
+            self._responses[slot] = response
+            self._scopes[slot] = scope
+            self._expires[slot] = now + self.ttl
+            self._last_used[slot] = now
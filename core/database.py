@@ -243,6 +243,25 @@ class DatabaseManager:
             
             return [dict(row) for row in cursor.fetchall()]
     
+    def get_documents_with_legacy_embeddings(self) -> List[Dict]:
+        """Get (id, embeddings) for documents whose embeddings are not yet int8-packed."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, embeddings FROM documents 
+                WHERE embeddings IS NOT NULL AND embeddings NOT LIKE 'q8%'
+            ''')
+            
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def update_document_embeddings(self, updates: List[tuple]):
+        """Rewrite stored embeddings from (embeddings, document_id) pairs."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('UPDATE documents SET embeddings = ? WHERE id = ?', updates)
+            conn.commit()
+    
     def create_reminder(self, user_id: int, title: str, description: str,
                        reminder_time: datetime, repeat_pattern: str = None) -> int:
         """Create a new reminder."""
@@ -0,0 +1,112 @@
+import os
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingBackend:
+    """
+    Sentence embedding backend for the knowledge base.
+    Runs an INT8-quantized ONNX export of MiniLM when USE_ONNX_EMBEDDINGS=1,
+    otherwise the FP32 SentenceTransformer model.
+    """
+
+    MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+
+    def __init__(self, model_name: str = None, cache_dir: str = None):
+        self.model_name = model_name or self.MODEL_NAME
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.dirname(__file__), '..', 'data', 'models', 'minilm-onnx-int8'
+        )
+        self.session = None
+        self.tokenizer = None
+        self.model = None
+        self.backend = None
+
+    @classmethod
+    def load(cls, **kwargs) -> Optional['EmbeddingBackend']:
+        """Build a backend, or return None when no embedding library is installed."""
+        backend = cls(**kwargs)
+        if os.getenv('USE_ONNX_EMBEDDINGS', '0').lower() in ('1', 'true', 'yes'):
+            try:
+                backend._load_onnx()
+                return backend
+            except Exception as e:
+                logger.warning(f"ONNX embeddings unavailable, falling back to SentenceTransformer: {e}")
+        try:
+            backend._load_sentence_transformer()
+            return backend
+        except Exception as e:
+            logger.warning(f"Sentence transformers not available. Semantic search disabled: {e}")
+            return None
+
+    def _load_onnx(self):
+        """Load (exporting and quantizing on first use) the INT8 ONNX model."""
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        quantized_path = os.path.join(self.cache_dir, 'model_quantized.onnx')
+        if not os.path.exists(quantized_path):
+            from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            ort_model = ORTModelForFeatureExtraction.from_pretrained(self.model_name, export=True)
+            ort_model.save_pretrained(self.cache_dir)
+            quantizer = ORTQuantizer.from_pretrained(self.cache_dir)
+            quantizer.quantize(
+                save_dir=self.cache_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            )
+            AutoTokenizer.from_pretrained(self.model_name).save_pretrained(self.cache_dir)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.cache_dir)
+        self.session = onnxruntime.InferenceSession(quantized_path, providers=['CPUExecutionProvider'])
+        self.backend = 'onnx-int8'
+        logger.info("Loaded INT8 ONNX embedding model")
+
+    def _load_sentence_transformer(self):
+        """Load the FP32 SentenceTransformer model."""
+        from sentence_transformers import SentenceTransformer
+        try:
+            import torch
+            torch.set_num_threads(os.cpu_count() or 1)
+        except ImportError:
+            pass
+        self.model = SentenceTransformer(self.model_name)
+        self.backend = 'sentence-transformers'
+
+    def encode(self, texts: List[str], batch_size: int = 32):
+        """Return L2-normalized float32 embeddings, one row per text."""
+        if self.session is None:
+            # SentenceTransformer sorts by length and pads per batch internally
+            return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                     normalize_embeddings=True, show_progress_bar=False)
+
+        import numpy as np
+
+        # Bucket by length so each batch pads only to its own longest text
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            rows = self._encode_onnx([texts[i] for i in idx])
+            if out.shape[1] == 0:
+                out = np.empty((len(texts), rows.shape[1]), dtype=np.float32)
+            out[idx] = rows
+        return out
+
+    def _encode_onnx(self, texts: List[str]):
+        """Run one padded batch through the ONNX session."""
+        import numpy as np
+
+        inputs = self.tokenizer(texts, padding=True, truncation=True, max_length=256, return_tensors='np')
+        input_names = {i.name for i in self.session.get_inputs()}
+        feed = {name: value for name, value in inputs.items() if name in input_names}
+        last_hidden_state = self.session.run(None, feed)[0]
+
+        # Mean-pool over real tokens, then L2-normalize
+        mask = inputs['attention_mask'][..., None].astype(np.float32)
+        pooled = (last_hidden_state * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
@@ -11,10 +11,12 @@ class MessageRouter:
     Handles message processing, context management, and response generation.
     """
     
-    def __init__(self, database_manager, ai_engine, scheduler):
+    def __init__(self, database_manager, ai_engine, scheduler, cache=None):
         self.db = database_manager
         self.ai = ai_engine
         self.scheduler = scheduler
+        self.cache = cache
+        self._assistant = None
         
         # Command handlers
         self.command_handlers = {
@@ -96,6 +98,12 @@ class MessageRouter:
                         'processing_time': response.get('processing_time')
                     }
                 )
+                
+                # Drop cached conversation listings that no longer reflect the DB (in
+                # every worker with Redis; in this process only without it)
+                if self.cache is not None:
+                    self.cache.bump_version(f"conv:{user['id']}")
+                    self.cache.bump_version("conv:all")
             
             return {
                 **response,
@@ -308,24 +316,31 @@ class MessageRouter:
         
         return context
     
+    @property
+    def assistant(self):
+        """JarvisAssistant built on first use and reused for every message."""
+        if self._assistant is None:
+            from core.assistant import JarvisAssistant
+            self._assistant = JarvisAssistant()
+        return self._assistant
+    
     def _handle_special_commands(self, content: str, context: Dict) -> Optional[str]:
         """Handle special commands like weather, news, etc."""
         content_lower = content.lower().strip()
         
-        # Import the existing special command handlers from assistant.py
-        from core.assistant import JarvisAssistant
-        assistant = JarvisAssistant()
+        # Reuse the existing special command handlers from assistant.py
+        assistant = self.assistant
         
         # Check if this is a reminder request and handle it specially
         if content_lower.startswith(('add task', 'schedule task', 'remind me', 'reminder')):
             user_id = context.get('user_id')
-            return assistant._parse_natural_reminder(content, user_id, self.scheduler)
+            return assistant._parse_natural_reminder(content, user_id, self.scheduler, message_lower=content_lower)
         
         # Check if this is a social media post command
         if content_lower.startswith(('post to twitter:', 'post to facebook:', 'post to both:')) or 'tech quote' in content_lower:
             try:
                 from core.social_media_manager import SocialMediaManager
-                social_manager = SocialMediaManager()
+                social_manager = SocialMediaManager(self.db, self.ai)
                 user_id = context.get('user_id')
                 result = social_manager.process_whatsapp_post_command(content, user_id)
                 if result:
@@ -333,7 +348,7 @@ class MessageRouter:
             except Exception as e:
                 return f"❌ Social media posting error: {str(e)}"
         
-        return assistant._handle_special_commands(content)
+        return assistant._handle_special_commands(content, content_lower)
     
     # Command handlers
     def _handle_help(self, user: Dict, content: str) -> Dict:
@@ -668,7 +683,7 @@ For Gmail, use an App Password instead of your regular password.''',
         try:
             from core.social_media_manager import SocialMediaManager
             
-            social_manager = SocialMediaManager()
+            social_manager = SocialMediaManager(self.db, self.ai)
             
             # Setup daily tech quotes
             social_manager.schedule_daily_tech_quotes(user['id'])
@@ -730,7 +745,7 @@ Your automated posting is ready! 🚀'''
         try:
             from core.social_media_manager import SocialMediaManager
             
-            social_manager = SocialMediaManager()
+            social_manager = SocialMediaManager(self.db, self.ai)
             stats = social_manager.get_posting_stats(user['id'])
             
             stats_text = f'''📊 **Social Media Statistics**
@@ -18,9 +18,10 @@ class SocialMediaManager:
     Handles scheduled posts, direct posting, and content generation.
     """
     
-    def __init__(self):
-        self.db = DatabaseManager()
-        self.ai = AIEngine()
+    def __init__(self, database_manager: DatabaseManager = None, ai_engine: AIEngine = None):
+        # Reuse the caller's components when given to avoid re-initializing them
+        self.db = database_manager or DatabaseManager()
+        self.ai = ai_engine or AIEngine()
         
         # Twitter/X API setup
         self.twitter_api = self._setup_twitter()
@@ -24,13 +24,10 @@ class PDFReader:
             str: Extracted text content
         """
         try:
-            text = ""
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
+                # One join instead of re-copying the growing string per page
+                text = "\n".join(page.extract_text() for page in pdf_reader.pages)
             
             return text.strip()
             
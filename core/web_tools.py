@@ -1,3 +1,4 @@
+import asyncio
 import requests
 import json
 from typing import Dict, List, Optional
@@ -9,6 +10,48 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+    aiohttp = None
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+NEWS_FEEDS = {
+    'general': 'https://feeds.bbci.co.uk/news/rss.xml',
+    'technology': 'https://feeds.bbci.co.uk/news/technology/rss.xml',
+    'science': 'https://feeds.bbci.co.uk/news/science_and_environment/rss.xml',
+    'business': 'https://feeds.bbci.co.uk/news/business/rss.xml',
+    'world': 'https://feeds.bbci.co.uk/news/world/rss.xml'
+}
+
+# One pooled aiohttp session per event loop, created on first use
+_aiohttp_session = None
+_aiohttp_loop = None
+
+async def _get_aiohttp_session():
+    """Return the shared aiohttp session for the running loop, creating it if needed."""
+    global _aiohttp_session, _aiohttp_loop
+    loop = asyncio.get_running_loop()
+    if _aiohttp_session is None or _aiohttp_session.closed or _aiohttp_loop is not loop:
+        connector = aiohttp.TCPConnector(limit=16, limit_per_host=4, ttl_dns_cache=300)
+        _aiohttp_session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=15)
+        )
+        _aiohttp_loop = loop
+    return _aiohttp_session
+
+async def close_async_session() -> None:
+    """Close the shared aiohttp session, if one was opened."""
+    global _aiohttp_session
+    if _aiohttp_session is not None and not _aiohttp_session.closed:
+        await _aiohttp_session.close()
+    _aiohttp_session = None
+
 class WebTools:
     """
     Web-based tools for gathering real-time information.
@@ -17,7 +60,7 @@ class WebTools:
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            'User-Agent': USER_AGENT
         })
     
     def search_web(self, query: str, num_results: int = 3) -> List[Dict]:
@@ -82,23 +125,41 @@ class WebTools:
             # Using OpenWeatherMap-like free API (wttr.in)
             url = f"https://wttr.in/{location}?format=j1"
             response = self.session.get(url)
-            data = response.json()
-            
-            current = data['current_condition'][0]
-            
-            return {
-                'location': location,
-                'temperature': f"{current['temp_C']}°C ({current['temp_F']}°F)",
-                'condition': current['weatherDesc'][0]['value'],
-                'humidity': f"{current['humidity']}%",
-                'wind': f"{current['windspeedKmph']} km/h",
-                'feels_like': f"{current['FeelsLikeC']}°C",
-                'visibility': f"{current['visibility']} km"
-            }
+            return self._parse_weather(location, response.json())
             
         except Exception as e:
             return {'error': f'Could not get weather for {location}: {str(e)}'}
     
+    async def get_weather_async(self, location: str) -> Dict:
+        """
+        Async get_weather over the shared aiohttp connection pool.
+        Falls back to the sync call in a worker thread when aiohttp is not installed.
+        """
+        if not HAS_AIOHTTP:
+            return await asyncio.to_thread(self.get_weather, location)
+        try:
+            session = await _get_aiohttp_session()
+            async with session.get(f"https://wttr.in/{location}?format=j1") as response:
+                data = await response.json(content_type=None)
+            return self._parse_weather(location, data)
+        except Exception as e:
+            return {'error': f'Could not get weather for {location}: {str(e)}'}
+    
+    @staticmethod
+    def _parse_weather(location: str, data: Dict) -> Dict:
+        """Shape a wttr.in j1 payload into the weather dict."""
+        current = data['current_condition'][0]
+        
+        return {
+            'location': location,
+            'temperature': f"{current['temp_C']}°C ({current['temp_F']}°F)",
+            'condition': current['weatherDesc'][0]['value'],
+            'humidity': f"{current['humidity']}%",
+            'wind': f"{current['windspeedKmph']} km/h",
+            'feels_like': f"{current['FeelsLikeC']}°C",
+            'visibility': f"{current['visibility']} km"
+        }
+    
     def get_news_headlines(self, category: str = 'general', count: int = 5) -> List[Dict]:
         """
         Get latest news headlines.
@@ -112,39 +173,50 @@ class WebTools:
         """
         try:
             # Using RSS feeds for free news access
-            rss_urls = {
-                'general': 'https://feeds.bbci.co.uk/news/rss.xml',
-                'technology': 'https://feeds.bbci.co.uk/news/technology/rss.xml',
-                'science': 'https://feeds.bbci.co.uk/news/science_and_environment/rss.xml',
-                'business': 'https://feeds.bbci.co.uk/news/business/rss.xml',
-                'world': 'https://feeds.bbci.co.uk/news/world/rss.xml'
-            }
-            
-            url = rss_urls.get(category, rss_urls['general'])
+            url = NEWS_FEEDS.get(category, NEWS_FEEDS['general'])
             response = self.session.get(url)
-            
-            from xml.etree import ElementTree as ET
-            root = ET.fromstring(response.content)
-            
-            headlines = []
-            for item in root.findall('.//item')[:count]:
-                title = item.find('title')
-                description = item.find('description')
-                link = item.find('link')
-                pub_date = item.find('pubDate')
-                
-                headlines.append({
-                    'title': title.text if title is not None else 'No title',
-                    'description': description.text if description is not None else 'No description',
-                    'url': link.text if link is not None else '',
-                    'published': pub_date.text if pub_date is not None else ''
-                })
-            
-            return headlines
+            return self._parse_headlines(response.content, count)
             
         except Exception as e:
             return [{'title': 'News Error', 'description': f'Could not fetch news: {str(e)}', 'url': '', 'published': ''}]
     
+    async def get_news_headlines_async(self, category: str = 'general', count: int = 5) -> List[Dict]:
+        """
+        Async get_news_headlines over the shared aiohttp connection pool.
+        Falls back to the sync call in a worker thread when aiohttp is not installed.
+        """
+        if not HAS_AIOHTTP:
+            return await asyncio.to_thread(self.get_news_headlines, category, count)
+        try:
+            session = await _get_aiohttp_session()
+            async with session.get(NEWS_FEEDS.get(category, NEWS_FEEDS['general'])) as response:
+                content = await response.read()
+            return self._parse_headlines(content, count)
+        except Exception as e:
+            return [{'title': 'News Error', 'description': f'Could not fetch news: {str(e)}', 'url': '', 'published': ''}]
+    
+    @staticmethod
+    def _parse_headlines(content: bytes, count: int) -> List[Dict]:
+        """Pull the first `count` items out of an RSS feed."""
+        from xml.etree import ElementTree as ET
+        root = ET.fromstring(content)
+        
+        headlines = []
+        for item in root.findall('.//item')[:count]:
+            title = item.find('title')
+            description = item.find('description')
+            link = item.find('link')
+            pub_date = item.find('pubDate')
+            
+            headlines.append({
+                'title': title.text if title is not None else 'No title',
+                'description': description.text if description is not None else 'No description',
+                'url': link.text if link is not None else '',
+                'published': pub_date.text if pub_date is not None else ''
+            })
+        
+        return headlines
+    
     def scrape_webpage(self, url: str) -> Dict:
         """
         Scrape content from a webpage.
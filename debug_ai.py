@@ -26,7 +26,7 @@ def test_ai_engine():
         
         # Test health check
         print("\n🔍 Testing health check...")
-        health = ai.health_check()
+        health = ai.health_check(deep=True)
         print(f"Health check result: {'✅ PASS' if health else '❌ FAIL'}")
         
         # Test simple response
@@ -1,19 +1,31 @@
 import os
 
+# Usage: gunicorn -c gunicorn.conf.py 'app:create_app()'
+
 # Server socket
 bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
 backlog = 2048
 
-# Worker processes
-workers = 1
-worker_class = "sync"
+# One worker process by default, with a small thread pool so slow webhook/API
+# requests don't block it. A chat's updates are kept in order inside one process
+# (app.py), and Telegram delivers them over several connections, so only raise
+# WEB_CONCURRENCY behind a proxy that routes each chat to the same worker.
+# Every worker also loads its own engines and models.
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+worker_class = "gthread"
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
 worker_connections = 1000
-timeout = 30
+timeout = 120
 keepalive = 2
 
-# Restart workers after this many requests, to help prevent memory leaks
-max_requests = 1000
-max_requests_jitter = 50
+# Give queued webhook updates (already acknowledged to Telegram/WhatsApp) time
+# to finish when a worker is stopped
+graceful_timeout = timeout
+
+# Worker recycling is off by default: a recycled worker drops any acknowledged
+# updates still queued past graceful_timeout. Set MAX_REQUESTS to enable it.
+max_requests = int(os.getenv('MAX_REQUESTS', '0'))
+max_requests_jitter = 50 if max_requests else 0
 
 # Logging
 accesslog = "-"
@@ -24,7 +36,8 @@ loglevel = "info"
 proc_name = "jarvis-bot"
 
 # Application
-wsgi_module = "app:create_app()"
+wsgi_app = "app:create_app()"
 
-# Preload app for better memory usage
-preload_app = True
+# Each worker builds its own app so the background scheduler thread lives in
+# a real worker process; app.py makes sure only one of them starts it
+preload_app = False
@@ -8,6 +8,7 @@ import tempfile
 from dotenv import load_dotenv
 import time
 import sys
+import re
 import requests
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -15,6 +16,7 @@ from core.assistant import JarvisAssistant
 from core.database import DatabaseManager
 from core.scheduler import SchedulerManager
 from core.email_agent import EmailAgent
+from core.web_tools import close_async_session
 
 # Load environment variables
 load_dotenv()
@@ -26,6 +28,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Patterns checked on every text message, compiled once at import.
+# One scan finds a video link; the group name says which downloader branch handles it
+_VIDEO_LINK = re.compile(
+    r'(?P<youtube>youtube\.com|youtu\.be)|(?P<short_video>instagram\.com|instagr\.am|tiktok\.com)',
+    re.IGNORECASE
+)
+_URL = re.compile(r'https?://\S+')
+_REMINDER_DAY = re.compile(r'remind me to\s+(.+?)\s+(?:by|at)\s+(today|tomorrow)\s+at\s+(\d{1,2}:\d{2}\s*(?:am|pm)?)', re.IGNORECASE)
+_REMINDER_CLOCK = re.compile(r'remind me to\s+(.+?)\s+(?:by|at)\s+(\d{1,2}:\d{2}\s*(?:am|pm)?)\b', re.IGNORECASE)
+_REMINDER_DATE = re.compile(r'remind me to\s+(.+?)\s+(?:by|at)\s+(\d{4}-\d{1,2}-\d{1,2})\s+(\d{1,2}:\d{2})', re.IGNORECASE)
+
 class TelegramBot:
     """
     Telegram bot integration for Jarvis Assistant.
@@ -244,10 +257,9 @@ Please check the configuration and try again.
             user_message = update.message.text
             user_id = update.effective_user.id
             
-            # Check for YouTube links with regex to include all variants
-            import re
-            youtube_patterns = [r'youtube\.com', r'youtu\.be', r'm\.youtube\.com']
-            if any(re.search(pattern, user_message, re.IGNORECASE) for pattern in youtube_patterns):
+            # Check for YouTube, Instagram and TikTok links in one pass
+            video_link = _VIDEO_LINK.search(user_message)
+            if video_link and video_link.lastgroup == 'youtube':
                 from core.youtube_utils import YouTubeDownloader
                 downloader = YouTubeDownloader()
                 
@@ -255,7 +267,7 @@ Please check the configuration and try again.
                 await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="upload_video")
                 
                 # Extract URL from message
-                url_match = re.search(r'https?://\S+', user_message)
+                url_match = _URL.search(user_message)
                 if not url_match:
                     await update.message.reply_text("I couldn't find a valid YouTube URL in your message.")
                     return
@@ -284,14 +296,13 @@ Please check the configuration and try again.
                     await update.message.reply_text(f"Failed to download video: {error}")
                     return
             
-            # Instagram/TikTok detection and download
-            ig_tt_patterns = [r'instagram\.com', r'instagr\.am', r'tiktok\.com', r'vm\.tiktok\.com']
-            if any(re.search(pattern, user_message, re.IGNORECASE) for pattern in ig_tt_patterns):
+            # Instagram/TikTok download
+            if video_link and video_link.lastgroup == 'short_video':
                 from core.youtube_utils import YouTubeDownloader
                 downloader = YouTubeDownloader()
                 
                 await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="upload_video")
-                url_match = re.search(r'https?://\S+', user_message)
+                url_match = _URL.search(user_message)
                 if not url_match:
                     await update.message.reply_text("I couldn't find a valid Instagram/TikTok URL in your message.")
                     return
@@ -323,9 +334,10 @@ Please check the configuration and try again.
             # Process message with assistant
             # Natural-language reminders: today/tomorrow by HH:MM(am/pm) or explicit date
             try:
-                m1 = re.search(r'remind me to\s+(.+?)\s+(?:by|at)\s+(today|tomorrow)\s+at\s+(\d{1,2}:\d{2}\s*(?:am|pm)?)', user_message, re.IGNORECASE)
-                m2 = re.search(r'remind me to\s+(.+?)\s+(?:by|at)\s+(\d{1,2}:\d{2}\s*(?:am|pm)?)\b', user_message, re.IGNORECASE)
-                m3 = re.search(r'remind me to\s+(.+?)\s+(?:by|at)\s+(\d{4}-\d{1,2}-\d{1,2})\s+(\d{1,2}:\d{2})', user_message, re.IGNORECASE)
+                # Later patterns only run when the earlier, more specific ones miss
+                m1 = _REMINDER_DAY.search(user_message)
+                m2 = None if m1 else _REMINDER_CLOCK.search(user_message)
+                m3 = None if m1 or m2 else _REMINDER_DATE.search(user_message)
                 time_tuple = None
                 title = None
                 if m1:
@@ -393,7 +405,7 @@ Please check the configuration and try again.
             except Exception as e:
                 logger.error(f"Reminder parse error: {e}")
             
-            response = self.assistant.process_text_message(user_message)
+            response = await self.assistant.process_text_message_batched(user_message, user_id)
             
             # Send text response
             await update.message.reply_text(response)
@@ -476,7 +488,7 @@ Please check the configuration and try again.
             try:
                 await doc_file.download_to_drive(local_path)
                 # Summarize PDF
-                summary = self.assistant.summarize_pdf(local_path)
+                summary = await self.assistant.summarize_pdf_async(local_path)
             finally:
                 # Best-effort cleanup, ignore failures
                 try:
@@ -647,6 +659,9 @@ Please check the configuration and try again.
                 .read_timeout(300.0)
                 .write_timeout(300.0)
                 .pool_timeout(300.0)
+                .post_shutdown(lambda application: close_async_session())
+                # Batching needs a user's messages handled concurrently to group them
+                .concurrent_updates(JarvisAssistant.CHAT_BATCHING)
                 .build()
             )
             
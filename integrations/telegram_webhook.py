@@ -22,8 +22,9 @@ class TelegramWebhook:
     Handles webhook processing and message routing.
     """
     
-    def __init__(self, message_router):
+    def __init__(self, message_router, session: Optional[requests.Session] = None):
         self.message_router = message_router
+        self.session = session or requests.Session()
         self.bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
         
         if not self.bot_token:
@@ -57,6 +58,16 @@ class TelegramWebhook:
             logger.error(f"Error handling Telegram update: {e}")
             return {'status': 'error', 'error': str(e)}
     
+    @staticmethod
+    def get_chat_key(update_data: Dict) -> Optional[str]:
+        """Return the chat an update belongs to, used to keep per-chat ordering."""
+        for field in ('message', 'edited_message'):
+            if field in update_data:
+                return str(update_data[field].get('chat', {}).get('id'))
+        if 'callback_query' in update_data:
+            return str(update_data['callback_query'].get('from', {}).get('id'))
+        return None
+    
     def _process_message(self, message: Dict) -> None:
         """Process individual Telegram message."""
         try:
@@ -231,7 +242,7 @@ class TelegramWebhook:
                 "parse_mode": "Markdown"
             }
             
-            response = requests.post(url, json=payload)
+            response = self.session.post(url, json=payload)
             
             if response.status_code == 200:
                 logger.info(f"Message sent successfully to chat {chat_id}")
@@ -255,7 +266,7 @@ class TelegramWebhook:
                 "caption": caption
             }
             
-            response = requests.post(url, json=payload)
+            response = self.session.post(url, json=payload)
             
             if response.status_code == 200:
                 logger.info(f"Photo sent successfully to chat {chat_id}")
@@ -279,7 +290,7 @@ class TelegramWebhook:
                     'chat_id': str(chat_id),
                     'caption': caption
                 }
-                response = requests.post(url, data=data, files=files)
+                response = self.session.post(url, data=data, files=files)
             
             if response.status_code == 200:
                 logger.info(f"Video sent successfully to chat {chat_id}")
@@ -297,7 +308,7 @@ class TelegramWebhook:
         try:
             # Get file info
             url = f"{self.api_base_url}/getFile"
-            response = requests.get(url, params={"file_id": file_id})
+            response = self.session.get(url, params={"file_id": file_id})
             
             if response.status_code != 200:
                 logger.error(f"Failed to get file info: {response.text}")
@@ -310,7 +321,7 @@ class TelegramWebhook:
             
             # Download the actual file
             file_url = f"https://api.telegram.org/file/bot{self.bot_token}/{file_path}"
-            file_response = requests.get(file_url)
+            file_response = self.session.get(file_url)
             
             if file_response.status_code != 200:
                 logger.error(f"Failed to download file: {file_response.status_code}")
@@ -350,7 +361,7 @@ class TelegramWebhook:
                 "text": text
             }
             
-            response = requests.post(url, json=payload)
+            response = self.session.post(url, json=payload)
             return response.status_code == 200
             
         except Exception as e:
@@ -16,8 +16,9 @@ class WhatsAppWebhook:
     Handles webhook verification and message processing.
     """
     
-    def __init__(self, message_router):
+    def __init__(self, message_router, session: Optional[requests.Session] = None):
         self.message_router = message_router
+        self.session = session or requests.Session()
         self.access_token = os.getenv('WHATSAPP_ACCESS_TOKEN')
         self.phone_number_id = os.getenv('WHATSAPP_PHONE_NUMBER_ID')
         self.webhook_verify_token = os.getenv('WHATSAPP_WEBHOOK_VERIFY_TOKEN')
@@ -94,6 +95,15 @@ class WhatsAppWebhook:
             logger.error(f"Error handling WhatsApp update: {e}")
             return {'status': 'error', 'error': str(e)}
     
+    @staticmethod
+    def get_chat_key(update_data: Dict) -> Optional[str]:
+        """Return the sender of the first message in an update, used to keep per-chat ordering."""
+        for entry in update_data.get('entry', []):
+            for change in entry.get('changes', []):
+                for message in change.get('value', {}).get('messages', []):
+                    return message.get('from')
+        return None
+    
     def _process_message(self, message: Dict, value: Dict) -> None:
         """Process individual WhatsApp message."""
         try:
@@ -240,7 +250,7 @@ class WhatsAppWebhook:
                 "Content-Type": "application/json"
             }
             
-            response = requests.post(url, json=payload, headers=headers)
+            response = self.session.post(url, json=payload, headers=headers)
             
             if response.status_code == 200:
                 logger.info(f"Message sent successfully to {to_number}")
@@ -273,7 +283,7 @@ class WhatsAppWebhook:
                 "Content-Type": "application/json"
             }
             
-            response = requests.post(url, json=payload, headers=headers)
+            response = self.session.post(url, json=payload, headers=headers)
             
             if response.status_code == 200:
                 logger.info(f"Image sent successfully to {to_number}")
@@ -293,7 +303,7 @@ class WhatsAppWebhook:
             url = f"https://graph.facebook.com/v18.0/{media_id}"
             headers = {"Authorization": f"Bearer {self.access_token}"}
             
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers)
             if response.status_code != 200:
                 logger.error(f"Failed to get media URL: {response.text}")
                 return None
@@ -304,7 +314,7 @@ class WhatsAppWebhook:
                 return None
             
             # Download the actual file
-            file_response = requests.get(media_url, headers=headers)
+            file_response = self.session.get(media_url, headers=headers)
             if file_response.status_code != 200:
                 logger.error(f"Failed to download media file: {file_response.status_code}")
                 return None